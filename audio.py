@@ -0,0 +1,150 @@
+"""
+Audio feedback for correct and incorrect keys.
+
+The sounds are short synthesized tones: a click whose pitch rises with the
+combo, and a low buzz for mistakes. They are written as WAV files to
+USER_DATA_DIR/sounds the first time the game runs, and each one is loaded
+into VOICES_PER_SOUND Kivy Sound objects at startup. Playing a key sound only
+picks the next voice in that sound's ring and restarts it. No decoding or file
+access happens per keystroke. At most MAX_VOICES sounds play at once; the
+oldest is cut off to make room.
+
+Set PIQ_AUDIO=0 to turn sound off. Without a Kivy audio provider (e.g. on a
+headless machine) the game falls back to a silent backend.
+"""
+
+import array
+import math
+import os
+import sys
+import wave
+from collections import deque
+
+from game_logic import USER_DATA_DIR
+from utils import atomic_write, env_flag
+
+AUDIO_ENABLED = env_flag('PIQ_AUDIO', default=True)
+SOUNDS_DIR = os.path.join(USER_DATA_DIR, 'sounds')
+
+SAMPLE_RATE = 22050
+# Click pitches for combos 1, 2, 3, ... (a rising major pentatonic scale)
+COMBO_FREQUENCIES = [523.25, 587.33, 659.25, 783.99, 880.00, 1046.50, 1174.66, 1318.51]
+CLICK_SECONDS = 0.06
+ERROR_FREQUENCY = 110.0
+ERROR_SECONDS = 0.18
+VOLUME = 0.5
+
+VOICES_PER_SOUND = 3 # Lets the same tone overlap during fast typing
+MAX_VOICES = 6 # Simultaneous sounds across all tones
+
+def tone_samples(frequency, seconds, decay, harmonics=(1.0,)) -> array.array:
+    """16-bit mono samples of a decaying tone, with a short fade-in to avoid a pop."""
+    count = int(SAMPLE_RATE * seconds)
+    fade_in = int(SAMPLE_RATE * 0.002)
+    samples = array.array('h', bytes(2 * count))
+    peak = 32767 * 0.8 / sum(harmonics)
+    for i in range(count):
+        t = i / SAMPLE_RATE
+        value = sum(level * math.sin(2 * math.pi * frequency * (n + 1) * t)
+                    for n, level in enumerate(harmonics))
+        envelope = math.exp(-decay * t) * min(1.0, i / fade_in if fade_in else 1.0)
+        samples[i] = int(peak * envelope * value)
+    return samples
+
+def write_wav(path, samples: array.array):
+    """Writes samples as a 16-bit mono WAV file (atomically, so readers never see half of it)."""
+    if sys.byteorder == 'big':
+        samples = array.array('h', samples)
+        samples.byteswap() # WAV data is little-endian
+    with atomic_write(path, 'wb') as f, wave.open(f, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+
+def generate_sounds(directory=SOUNDS_DIR) -> dict:
+    """Creates any missing tone files and returns {name: path}."""
+    tones = {f'click_{step}': (frequency, CLICK_SECONDS, 60.0, (1.0, 0.3))
+             for step, frequency in enumerate(COMBO_FREQUENCIES)}
+    tones['error'] = (ERROR_FREQUENCY, ERROR_SECONDS, 12.0, (1.0, 0.6, 0.4, 0.2))
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, (frequency, seconds, decay, harmonics) in tones.items():
+        path = os.path.join(directory, f'{name}.wav')
+        if not os.path.exists(path):
+            write_wav(path, tone_samples(frequency, seconds, decay, harmonics))
+        paths[name] = path
+    return paths
+
+class NullAudio:
+    """Silent backend for headless machines or when sound is turned off."""
+
+    def play_correct(self, combo: int):
+        pass
+
+    def play_error(self):
+        pass
+
+class AudioFeedback:
+    """Plays preloaded key sounds from fixed pools of voices."""
+
+    def __init__(self, voices: dict, max_voices=MAX_VOICES):
+        self.voices = voices # name -> list of Kivy Sound objects
+        self.next_voice = {name: 0 for name in voices}
+        self.playing = deque() # Voices started most recently, oldest first
+        self.max_voices = max_voices
+        self.click_names = [f'click_{step}' for step in range(len(COMBO_FREQUENCIES))]
+
+    @classmethod
+    def load(cls):
+        """Generates and loads every sound, or returns NullAudio if that isn't possible."""
+        if not AUDIO_ENABLED:
+            return NullAudio()
+        try:
+            paths = generate_sounds()
+        except OSError as e:
+            print(f"Error generating sounds in {SOUNDS_DIR}: {e}")
+            return NullAudio()
+        from kivy.core.audio import SoundLoader
+        voices = {}
+        for name, path in paths.items():
+            pool = []
+            for _ in range(VOICES_PER_SOUND):
+                sound = SoundLoader.load(path)
+                # Providers can return a sound that failed to open (e.g. no audio device)
+                if not sound or not sound.length:
+                    print("Warning: No audio device or provider available, key sounds disabled.")
+                    return NullAudio()
+                sound.volume = VOLUME
+                pool.append(sound)
+            voices[name] = pool
+        return cls(voices)
+
+    def play(self, name: str):
+        """Restarts the next voice for a sound, cutting off the oldest if at the cap."""
+        pool = self.voices[name]
+        index = self.next_voice[name]
+        self.next_voice[name] = (index + 1) % len(pool)
+        voice = pool[index]
+        if voice in self.playing:
+            self.playing.remove(voice) # At most max_voices entries, so this stays cheap
+        while len(self.playing) >= self.max_voices:
+            self.playing.popleft().stop()
+        if voice.state == 'play':
+            voice.stop()
+        voice.play()
+        self.playing.append(voice)
+
+    def play_correct(self, combo: int):
+        step = min(max(combo, 1), len(self.click_names)) - 1
+        self.play(self.click_names[step])
+
+    def play_error(self):
+        self.play('error')
+
+audio_feedback = NullAudio()
+
+def start():
+    """Loads the key sounds; called once while the app builds."""
+    global audio_feedback
+    audio_feedback = AudioFeedback.load()
@@ -1,13 +1,31 @@
 #!/usr/bin/env python
 """
-Build script for packaging πQ into a single executable.
+Build script for packaging πQ into a standalone executable.
 This script ensures all dependencies are installed and runs PyInstaller.
+
+Two packaging modes are available:
+  onefile - a single UPX-compressed executable (piQ.spec, the default)
+  onedir  - an unpacked directory with a trimmed Kivy footprint (piQ_onedir.spec),
+            which launches much faster because nothing is extracted at startup
+
+Use --benchmark to report cold/warm launch time and bundle size for each build.
+A cold launch needs the OS file cache dropped first, which takes root on Linux
+(/proc/sys/vm/drop_caches) and macOS (purge); elsewhere it is skipped.
 """
 
 import os
 import sys
 import subprocess
 import platform
+import argparse
+import statistics
+import time
+
+# Where each packaging mode puts its output, relative to the project root
+BUILD_MODES = {
+    'onefile': {'spec': 'piQ.spec', 'distpath': 'dist', 'workpath': os.path.join('build', 'onefile')},
+    'onedir': {'spec': 'piQ_onedir.spec', 'distpath': os.path.join('dist', 'onedir'), 'workpath': os.path.join('build', 'onedir')},
+}
 
 def check_python_version():
     """Verify Python version is at least 3.7"""
@@ -21,6 +39,7 @@ def install_dependencies():
         "kivy>=2.3.0",
         "pyinstaller>=5.0",
         "pillow",  # Required for some Kivy functionality
+        "numpy",  # Digit trivia (optional at runtime)
         "kivy_deps.sdl2", 
         "kivy_deps.glew"
     ]
@@ -59,13 +78,20 @@ def create_icon():
     except Exception as e:
         print(f"Error creating icon: {e}")
 
-def build_executable():
-    """Run PyInstaller to build the executable"""
-    print("Building executable with PyInstaller...")
+def build_executable(mode="onefile"):
+    """Run PyInstaller to build the executable in the given packaging mode"""
+    print(f"Building {mode} executable with PyInstaller...")
+    config = BUILD_MODES[mode]
     
     # Check if spec file exists, use it if it does
-    if os.path.exists("piQ.spec"):
-        cmd = ["pyinstaller", "--noconfirm", "piQ.spec"]
+    if os.path.exists(config['spec']):
+        cmd = ["pyinstaller", "--noconfirm",
+               "--distpath", config['distpath'],
+               "--workpath", config['workpath'],
+               config['spec']]
+    elif mode == "onedir":
+        print(f"Error: {config['spec']} not found, cannot build the onedir bundle.")
+        sys.exit(1)
     else:
         # Build command for different platforms
         if platform.system() == "Windows":
@@ -97,22 +123,121 @@ def build_executable():
     
     try:
         subprocess.check_call(cmd)
-        print("\nBuild successful! Executable is located in the 'dist' folder.")
+        print(f"\nBuild successful! Executable is located in the '{config['distpath']}' folder.")
     except subprocess.CalledProcessError as e:
         print(f"Build failed with error: {e}")
         sys.exit(1)
 
+def get_executable_path(mode):
+    """Returns the path of the built executable for a packaging mode"""
+    name = "piQ.exe" if platform.system() == "Windows" else "piQ"
+    distpath = BUILD_MODES[mode]['distpath']
+    if mode == "onedir":
+        return os.path.join(distpath, "piQ", name)
+    return os.path.join(distpath, name)
+
+def get_bundle_size(mode):
+    """Returns the size in bytes of everything the packaging mode ships"""
+    executable = get_executable_path(mode)
+    if mode == "onefile":
+        return os.path.getsize(executable)
+    total = 0
+    for root, _, files in os.walk(os.path.dirname(executable)):
+        for filename in files:
+            total += os.path.getsize(os.path.join(root, filename))
+    return total
+
+def drop_file_cache():
+    """Evicts the OS page cache so the next launch reads from disk; returns success"""
+    system = platform.system()
+    try:
+        if system == "Linux":
+            os.sync()
+            with open("/proc/sys/vm/drop_caches", "w") as f:
+                f.write("3\n")
+            return True
+        if system == "Darwin":
+            return subprocess.run(["purge"], capture_output=True, timeout=120).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return False
+
+def time_launch(executable, env):
+    start = time.perf_counter()
+    subprocess.run([executable], env=env, check=True, timeout=120)
+    return time.perf_counter() - start
+
+def measure_launch_time(mode, runs=5):
+    """Launches the built app repeatedly and returns (cold, warm) seconds.
+
+    The app is started with PIQ_LAUNCH_PROBE set, which makes it quit right after
+    drawing its first frame. Cold is one launch right after dropping the OS file
+    cache, or None if that isn't possible here; warm is the median of the rest.
+    """
+    executable = get_executable_path(mode)
+    env = dict(os.environ, PIQ_LAUNCH_PROBE="1")
+    cold = time_launch(executable, env) if drop_file_cache() else None
+    warm = [time_launch(executable, env) for _ in range(max(runs, 1))]
+    return cold, statistics.median(warm)
+
+def report_benchmarks(modes, runs):
+    """Prints launch time and bundle size for each built packaging mode"""
+    print("\n===== Launch Benchmark =====")
+    print(f"{'Mode':<10}{'Cold (s)':>10}{'Warm (s)':>10}{'Size (MB)':>12}")
+    skipped_cold = False
+    for mode in modes:
+        if not os.path.exists(get_executable_path(mode)):
+            print(f"{mode:<10}  not built, skipping")
+            continue
+        try:
+            cold, warm = measure_launch_time(mode, runs)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            print(f"{mode:<10}  launch failed: {e}")
+            continue
+        size_mb = get_bundle_size(mode) / (1024 * 1024)
+        cold_text = f"{cold:.2f}" if cold is not None else "-"
+        print(f"{mode:<10}{cold_text:>10}{warm:>10.2f}{size_mb:>12.1f}")
+        skipped_cold = skipped_cold or cold is None
+    if skipped_cold:
+        print("Warning: Couldn't drop the OS file cache (needs root on Linux and macOS, "
+              "unsupported on Windows), so cold launches were skipped.")
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Package πQ with PyInstaller.")
+    parser.add_argument("--mode", choices=["onefile", "onedir", "all"], default="onefile",
+                        help="packaging mode to build (default: onefile)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="report cold/warm launch time and bundle size after building")
+    parser.add_argument("--benchmark-only", action="store_true",
+                        help="benchmark existing builds without rebuilding")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="launches per build when benchmarking (default: 5)")
+    parser.add_argument("--skip-install", action="store_true",
+                        help="don't pip install the build dependencies first")
+    return parser.parse_args()
+
 def main():
     """Main build function"""
-    print("===== Building πQ Application =====")
-    
-    check_python_version()
-    install_dependencies()
-    create_icon()
-    build_executable()
-    
-    print("\n===== Build Complete =====")
-    print(f"The executable is in the 'dist' directory: {os.path.abspath('dist')}")
+    args = parse_args()
+    modes = list(BUILD_MODES) if args.mode == "all" else [args.mode]
+
+    if not args.benchmark_only:
+        print("===== Building πQ Application =====")
+
+        check_python_version()
+        if not args.skip_install:
+            install_dependencies()
+        create_icon()
+        for mode in modes:
+            build_executable(mode)
+
+        print("\n===== Build Complete =====")
+        for mode in modes:
+            print(f"The {mode} executable is at: {os.path.abspath(get_executable_path(mode))}")
+
+    if args.benchmark or args.benchmark_only:
+        report_benchmarks(modes, args.runs)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
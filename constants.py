@@ -0,0 +1,290 @@
+"""
+Digit providers for the constants the game can be played with.
+
+π comes from the bundled pi_digits.txt. The others are computed on first use
+with exact integer arithmetic:
+
+- e: binary splitting of the series sum of 1/k!
+- √2 and φ: integer square roots
+- τ: 2π, with π from the Chudnovsky series (binary splitting)
+
+Digits are computed in stages (STAGE_TARGETS), each one a separate job in a
+process pool, so the first thousand digits are playable almost at once while
+longer expansions are still running. Every finished stage is cached, zlib
+compressed, in the cache directory (USER_DATA_DIR/constants), and later
+launches read it back in milliseconds.
+
+This module doesn't import Kivy or game_logic, so pool workers start quickly.
+Listeners are called from a background thread; UI code must hop back to its
+main thread (e.g. with Clock.schedule_once).
+"""
+
+import math
+import os
+import sys
+import threading
+import zlib
+from functools import partial
+
+from utils import atomic_write
+
+DEFAULT_CONSTANT = 'pi'
+# Decimal places computed for each constant; each stage is a separate pool job
+STAGE_TARGETS = (1_000, 10_000, 100_000)
+GUARD_DIGITS = 10 # Extra digits computed and dropped, so truncation never rounds wrong
+MAX_WORKERS = 4
+# Decimals converted to str at a time; below Python's default limit of 4300 digits
+FORMAT_CHUNK_DIGITS = 4000
+
+class Constant:
+    """Display details and the digit source of one constant."""
+
+    def __init__(self, key, symbol, name, prefix, compute=None):
+        self.key = key
+        self.symbol = symbol
+        self.name = name
+        self.prefix = prefix # Known leading digits, used to check cached files
+        self.compute = compute # compute(decimals) -> floor(value * 10**decimals), or None
+
+    @property
+    def label(self) -> str:
+        return f"{self.symbol}  {self.name}"
+
+# --- Fixed-point computations (value * 10**decimals, rounded down) ---
+
+def _e_series(a, b):
+    """Binary splitting of sum_{k=a+1}^{b} a!/k!, as (numerator, denominator)."""
+    if b - a == 1:
+        return 1, b
+    m = (a + b) // 2
+    p1, q1 = _e_series(a, m)
+    p2, q2 = _e_series(m, b)
+    return p1 * q2 + p2, q1 * q2
+
+def compute_e(decimals: int) -> int:
+    terms = 2
+    while math.lgamma(terms + 1) / math.log(10) < decimals + 2: # terms! > 10**decimals
+        terms += max(terms // 8, 1)
+    p, q = _e_series(0, terms)
+    one = 10 ** decimals
+    return one + p * one // q
+
+def compute_sqrt2(decimals: int) -> int:
+    return math.isqrt(2 * 10 ** (2 * decimals))
+
+def compute_phi(decimals: int) -> int:
+    return (10 ** decimals + math.isqrt(5 * 10 ** (2 * decimals))) // 2
+
+CHUDNOVSKY_C3_OVER_24 = 640320 ** 3 // 24
+CHUDNOVSKY_DIGITS_PER_TERM = 14.181647462725477
+
+def _chudnovsky_series(a, b):
+    """Binary splitting of the Chudnovsky series terms a..b-1, as (P, Q, T)."""
+    if b - a == 1:
+        if a == 0:
+            p = q = 1
+        else:
+            p = (6 * a - 5) * (2 * a - 1) * (6 * a - 1)
+            q = a * a * a * CHUDNOVSKY_C3_OVER_24
+        t = p * (13591409 + 545140134 * a)
+        return p, q, -t if a & 1 else t
+    m = (a + b) // 2
+    p1, q1, t1 = _chudnovsky_series(a, m)
+    p2, q2, t2 = _chudnovsky_series(m, b)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+def compute_pi(decimals: int) -> int:
+    terms = int(decimals / CHUDNOVSKY_DIGITS_PER_TERM) + 2
+    _, q, t = _chudnovsky_series(0, terms)
+    one = 10 ** decimals
+    return q * 426880 * math.isqrt(10005 * one * one) // t
+
+def compute_tau(decimals: int) -> int:
+    return 2 * compute_pi(decimals)
+
+CONSTANTS = {
+    'pi': Constant('pi', 'π', 'Pi', '3.14159265358979'),
+    'e': Constant('e', 'e', "Euler's number", '2.71828182845904', compute_e),
+    'sqrt2': Constant('sqrt2', '√2', 'Square root of 2', '1.41421356237309', compute_sqrt2),
+    'phi': Constant('phi', 'φ', 'Golden ratio', '1.61803398874989', compute_phi),
+    'tau': Constant('tau', 'τ', 'Tau (2π)', '6.28318530717958', compute_tau),
+}
+
+def format_fixed_point(value: int, decimals: int) -> str:
+    """Formats floor(x * 10**decimals) as "I.DDDD..." with exactly `decimals` places."""
+    integer_part, fraction = divmod(value, 10 ** decimals)
+    # Python 3.11+ refuses to convert very long ints to str, and lifting that limit
+    # is process-wide (unsafe with the thread pool), so convert in short chunks
+    chunks = []
+    remaining = decimals
+    while remaining > 0:
+        size = min(FORMAT_CHUNK_DIGITS, remaining)
+        fraction, chunk = divmod(fraction, 10 ** size)
+        chunks.append(str(chunk).zfill(size))
+        remaining -= size
+    return f"{integer_part}.{''.join(reversed(chunks))}"
+
+def compute_digits(key: str, decimals: int) -> str:
+    """Returns "I.DDDD..." for a constant with the given number of decimals (runs in the pool)."""
+    constant = CONSTANTS[key]
+    value = constant.compute(decimals + GUARD_DIGITS) // 10 ** GUARD_DIGITS
+    return format_fixed_point(value, decimals)
+
+def decimal_count(digits: str) -> int:
+    """Number of decimals in "I.DDDD..." (0 for an empty string)."""
+    return len(digits) - digits.index('.') - 1 if '.' in digits else 0
+
+def pool_context():
+    """Multiprocessing context for the pool workers, or None to use a thread.
+
+    Spawned workers re-import the launching script, and for main.py that means
+    importing Kivy and opening a window. Packaged builds avoid this, because
+    multiprocessing.freeze_support() runs first in main.py. From source, only
+    Linux can fork instead (macOS can't fork safely once a GUI is up).
+    """
+    import multiprocessing # Only needed once a constant has to be computed
+    if getattr(sys, 'frozen', False):
+        return multiprocessing.get_context()
+    if sys.platform.startswith('linux') and 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+class ConstantLibrary:
+    """The digits available for every constant, filled in from cache and pool jobs."""
+
+    def __init__(self, cache_dir, pi_digits: str):
+        self.cache_dir = cache_dir
+        self.digits = {key: '' for key in CONSTANTS} # key -> "I.DDDD..." available so far
+        self.digits[DEFAULT_CONSTANT] = pi_digits
+        self.pending = {key: set() for key in CONSTANTS} # key -> stage targets being computed
+        self._cache_loaded = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock() # Stages can finish together; write one at a time
+        self._pool = None
+
+    def cache_path(self, key) -> str:
+        return os.path.join(self.cache_dir, f"{key}.digits.z")
+
+    def add_listener(self, callback):
+        """callback(key) runs on a background thread whenever more digits arrive."""
+        self._listeners.append(callback)
+
+    def get(self, key) -> str:
+        self._load_cache(key)
+        return self.digits[key]
+
+    def target(self, key) -> int:
+        """Decimals the constant will have once every stage is done."""
+        if CONSTANTS[key].compute is None:
+            return decimal_count(self.digits[key])
+        return STAGE_TARGETS[-1]
+
+    def is_computing(self, key) -> bool:
+        return bool(self.pending[key])
+
+    def request(self, key):
+        """Starts computing any stages beyond the cached digits, in the background."""
+        constant = CONSTANTS[key]
+        self._load_cache(key)
+        if constant.compute is None:
+            return
+        with self._lock:
+            available = decimal_count(self.digits[key])
+            stages = [target for target in STAGE_TARGETS
+                      if target > available and target not in self.pending[key]]
+            if not stages:
+                return
+            pool = self._get_pool()
+            self.pending[key].update(stages)
+            futures = [(target, pool.submit(compute_digits, key, target)) for target in stages]
+        # Outside the lock: a job that already finished runs its callback right here
+        for target, future in futures:
+            future.add_done_callback(partial(self._on_computed, key, target))
+
+    def ensure(self, key, decimals: int):
+        """Makes at least `decimals` decimals available, computing them inline if needed.
+
+        Never goes past the last stage, the most the game ever offers.
+        """
+        self._load_cache(key)
+        decimals = min(decimals, self.target(key))
+        if CONSTANTS[key].compute is None or decimal_count(self.digits[key]) >= decimals:
+            return
+        target = next(stage for stage in STAGE_TARGETS if stage >= decimals)
+        self._store(key, compute_digits(key, target), save=False)
+
+    def shutdown(self):
+        """Stops the pool without waiting for jobs still running."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            workers = min(MAX_WORKERS, os.cpu_count() or 1, len(STAGE_TARGETS) * (len(CONSTANTS) - 1))
+            # Imported here: most sessions only play π and never need a pool
+            try:
+                from concurrent.futures import ProcessPoolExecutor
+                context = pool_context()
+                if context is None:
+                    raise NotImplementedError("spawned workers would re-run the launching script")
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            except (ImportError, NotImplementedError, OSError) as e:
+                # e.g. Android and iOS have no working multiprocessing
+                from concurrent.futures import ThreadPoolExecutor
+                print(f"Warning: No process pool ({e}); computing constants in a thread.")
+                self._pool = ThreadPoolExecutor(max_workers=1)
+        return self._pool
+
+    def _on_computed(self, key, target, future):
+        with self._lock:
+            self.pending[key].discard(target)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            print(f"Error computing {CONSTANTS[key].name}: {error}")
+            return
+        if self._store(key, future.result(), save=True):
+            for callback in list(self._listeners):
+                callback(key)
+
+    def _store(self, key, digits: str, save: bool) -> bool:
+        """Keeps digits if they extend what we have; returns True if they did."""
+        with self._lock:
+            if decimal_count(digits) <= decimal_count(self.digits[key]):
+                return False
+            self.digits[key] = digits # Replaced in one step; readers see old or new
+        if save:
+            self._save_cache(key)
+        return True
+
+    def _load_cache(self, key):
+        if key in self._cache_loaded or CONSTANTS[key].compute is None:
+            return
+        self._cache_loaded.add(key)
+        path = self.cache_path(key)
+        try:
+            with open(path, 'rb') as f:
+                digits = zlib.decompress(f.read()).decode('ascii')
+        except FileNotFoundError:
+            return
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            print(f"Error reading cached digits from {path}: {e}")
+            return
+        if not digits.startswith(CONSTANTS[key].prefix) or not digits.replace('.', '', 1).isdigit():
+            print(f"Warning: {path} doesn't hold the digits of {CONSTANTS[key].name}, ignoring it.")
+            return
+        self._store(key, digits, save=False)
+
+    def _save_cache(self, key):
+        path = self.cache_path(key)
+        with self._save_lock:
+            digits = self.digits[key] # Always the longest, even if stages finished out of order
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with atomic_write(path, 'wb') as f:
+                    f.write(zlib.compress(digits.encode('ascii'), 9))
+            except OSError as e:
+                print(f"Error caching digits to {path}: {e}")
@@ -0,0 +1,212 @@
+"""
+Vectorized statistics over the loaded digit set, for trivia on the landing
+and countdown screens.
+
+The digits are read as a uint8 array of ASCII characters straight from the
+memory-mapped file (no copy), and every statistic is a handful of NumPy
+passes over that view. Positions are decimal places, i.e. position 1 is the
+first digit after the decimal point. Results are cached per digit count.
+"""
+
+import math
+import random
+
+import numpy as np
+
+from game_logic import PI_DIGITS_FILE
+
+ASCII_ZERO = ord('0')
+# Digits counted per bincount call; keeps the temporary int array small
+COUNT_CHUNK = 1 << 20
+# Run length at which longest_run() stops adding a pass per digit of run length
+RUN_PASSES = 32
+# Longest pattern first_occurrences() will tabulate (10**7 entries = 80 MB)
+MAX_PATTERN_LENGTH = 7
+
+def chi_square_p_value(statistic: float, dof: int = 9) -> float:
+    """Upper-tail probability of the chi-square distribution for odd dof."""
+    if dof % 2 != 1:
+        raise ValueError("Only odd degrees of freedom are supported")
+    if statistic <= 0:
+        return 1.0
+    # Closed form for odd dof: erfc term plus a finite series
+    term = math.sqrt(2 * statistic / math.pi) * math.exp(-statistic / 2)
+    series = 0.0
+    for j in range(1, (dof - 1) // 2 + 1):
+        series += term
+        term *= statistic / (2 * j + 1)
+    return min(math.erfc(math.sqrt(statistic / 2)) + series, 1.0)
+
+class DigitAnalytics:
+    """Digit statistics over an ASCII digit array (the decimals only)."""
+
+    def __init__(self, ascii_digits: np.ndarray):
+        self.ascii_digits = ascii_digits
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, path=PI_DIGITS_FILE):
+        """Memory-maps a digit file such as pi_digits.txt ("3.14159...")."""
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        # Skip the integer part and the decimal point, if any
+        head = bytes(data[:32])
+        start = head.index(b'.') + 1 if b'.' in head else 0
+        end = len(data)
+        while end > start and not ASCII_ZERO <= data[end - 1] <= ASCII_ZERO + 9:
+            end -= 1 # Trailing newline / whitespace
+        return cls._checked(data[start:end], path)
+
+    @classmethod
+    def from_string(cls, text: str):
+        """Builds analytics for a digit string like GameLogic.pi_digits."""
+        if '.' in text:
+            text = text.split('.', 1)[1]
+        return cls._checked(np.frombuffer(text.strip().encode('ascii'), dtype=np.uint8), 'digit string')
+
+    @classmethod
+    def _checked(cls, ascii_digits, source):
+        invalid = (ascii_digits < ASCII_ZERO) | (ascii_digits > ASCII_ZERO + 9)
+        if invalid.any():
+            # Wrapped or otherwise formatted files can't be used as a zero-copy view
+            print(f"Warning: {source} contains non-digit characters, copying digits only.")
+            ascii_digits = ascii_digits[~invalid]
+        return cls(ascii_digits)
+
+    def __len__(self):
+        return len(self.ascii_digits)
+
+    def _limit(self, n) -> int:
+        return len(self.ascii_digits) if n is None else max(0, min(int(n), len(self.ascii_digits)))
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def digit_counts(self, n=None) -> np.ndarray:
+        """How often each digit 0-9 occurs in the first n decimals."""
+        n = self._limit(n)
+
+        def compute():
+            counts = np.zeros(ASCII_ZERO + 10, dtype=np.int64)
+            for start in range(0, n, COUNT_CHUNK):
+                chunk = self.ascii_digits[start:min(start + COUNT_CHUNK, n)]
+                counts += np.bincount(chunk, minlength=ASCII_ZERO + 10)
+            return counts[ASCII_ZERO:]
+        return self._cached(('counts', n), compute)
+
+    def longest_run(self, n=None) -> tuple:
+        """(digit, length, position) of the longest run of one repeated digit."""
+        n = self._limit(n)
+
+        def compute():
+            if n == 0:
+                return (None, 0, None)
+            digits = self.ascii_digits[:n]
+            # run[i]: digits i..i+length are all equal. Each pass is one boolean
+            # AND, and random digits rarely repeat more than ten times in a row
+            same = digits[1:] == digits[:-1]
+            run = same
+            length, start = 1, 0
+            while run.any():
+                length += 1
+                start = int(run.argmax())
+                if length >= RUN_PASSES:
+                    return self._longest_run_by_starts(digits)
+                run = run[:-1] & same[length - 1:]
+            return (int(digits[start]) - ASCII_ZERO, length, start + 1)
+        return self._cached(('run', n), compute)
+
+    @staticmethod
+    def _longest_run_by_starts(digits) -> tuple:
+        """longest_run() via the index of every run start; fast for any run length."""
+        starts = np.concatenate(([0], np.flatnonzero(digits[1:] != digits[:-1]) + 1, [len(digits)]))
+        lengths = np.diff(starts)
+        longest = int(lengths.argmax())
+        start = int(starts[longest])
+        return (int(digits[start]) - ASCII_ZERO, int(lengths[longest]), start + 1)
+
+    def first_occurrences(self, k: int, n=None) -> np.ndarray:
+        """First position of every k-digit pattern (index = pattern value, -1 = absent)."""
+        if not 1 <= k <= MAX_PATTERN_LENGTH:
+            raise ValueError(f"Pattern length must be between 1 and {MAX_PATTERN_LENGTH}")
+        n = self._limit(n)
+
+        def compute():
+            windows = max(n - k + 1, 0)
+            codes = np.zeros(windows, dtype=np.int32)
+            for offset in range(k):
+                codes *= 10
+                codes += self.ascii_digits[offset:offset + windows]
+                codes -= ASCII_ZERO
+            # minimum.at is unbuffered, so repeated patterns keep their smallest
+            # position (a plain scatter leaves which write wins undefined)
+            absent = windows + 1
+            first = np.full(10 ** k, absent, dtype=np.int64)
+            np.minimum.at(first, codes, np.arange(1, windows + 1))
+            first[first == absent] = -1
+            return first
+        return self._cached(('first', k, n), compute)
+
+    def find(self, pattern: str, n=None) -> int | None:
+        """Decimal place where pattern first appears, or None."""
+        if not pattern.isdigit():
+            raise ValueError("Pattern must contain digits only")
+        if len(pattern) > MAX_PATTERN_LENGTH:
+            position = bytes(self.ascii_digits[:self._limit(n)]).find(pattern.encode('ascii'))
+            return position + 1 if position >= 0 else None
+        position = int(self.first_occurrences(len(pattern), n)[int(pattern)])
+        return position if position > 0 else None
+
+    def chi_square(self, n=None) -> tuple:
+        """(statistic, p-value) of a chi-square test that the digits are uniform."""
+        n = self._limit(n)
+
+        def compute():
+            if n == 0:
+                return (0.0, 1.0)
+            expected = n / 10
+            statistic = float((((self.digit_counts(n) - expected) ** 2) / expected).sum())
+            return (statistic, chi_square_p_value(statistic, dof=9))
+        return self._cached(('chi2', n), compute)
+
+    def trivia(self, n=None, name='π') -> list:
+        """Human-readable facts about the first n decimals."""
+        n = self._limit(n)
+        if n == 0:
+            return []
+        counts = self.digit_counts(n)
+        most, least = int(counts.argmax()), int(counts.argmin())
+        digit, length, position = self.longest_run(n)
+        statistic, p_value = self.chi_square(n)
+        facts = [
+            f"In the first {n:,} decimals of {name}, {most} appears most often ({counts[most]:,} times) "
+            f"and {least} least often ({counts[least]:,} times).",
+            f"The longest run of one digit in the first {n:,} decimals of {name} is "
+            f"{length} × '{digit}', starting at decimal {position:,}.",
+            f"A chi-square test on the first {n:,} decimals gives χ² = {statistic:.2f} "
+            f"(p = {p_value:.2f}): the digits "
+            f"{'look uniformly random' if p_value >= 0.01 else 'are surprisingly uneven'}.",
+        ]
+        for k in (2, 3):
+            if n >= 10 ** k:
+                first = self.first_occurrences(k, n)
+                if (first > 0).all():
+                    last_pattern = int(first.argmax())
+                    facts.append(f"Every {k}-digit pattern appears in {name}'s first {n:,} decimals; "
+                                 f"the last to show up is {last_pattern:0{k}d}, at decimal {first[last_pattern]:,}.")
+        return facts
+
+    def random_trivia(self, n=None, name='π') -> str:
+        """One random fact, for display on the landing or countdown screen."""
+        facts = self.trivia(n, name)
+        return random.choice(facts) if facts else ""
+
+_default_analytics = None
+
+def get_analytics() -> DigitAnalytics:
+    """Shared analytics over the bundled digit file, loaded on first use."""
+    global _default_analytics
+    if _default_analytics is None:
+        _default_analytics = DigitAnalytics.from_file()
+    return _default_analytics
@@ -0,0 +1,129 @@
+"""
+Idle-aware frame pacing.
+
+Kivy's event loop wakes up maxfps times a second (60 by default) even when
+nothing on screen changes. The rates follow what the player is doing:
+
+- menu: landing and countdown screens, which only change on input or once a second
+- active: a round with recent input, at the configured maxfps
+- idle: a round with no input for IDLE_AFTER seconds
+- paused: the window is unfocused or minimized
+
+Kivy polls input once per loop iteration, so the loop rate bounds how late a
+key is seen. In an idle round the loop drops only to IDLE_LOOP_FPS, which adds
+at most about 17 ms to the first key after a pause, while the game screen's
+background animation drops further, to IDLE_FPS (see
+GameScreen._schedule_background). The next key press switches both back to the
+active rate at once.
+"""
+
+import time
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.event import EventDispatcher
+from kivy.properties import OptionProperty
+
+import metrics
+
+ACTIVE = 'active'
+IDLE = 'idle'
+PAUSED = 'paused'
+MENU = 'menu'
+
+# Seconds without input before a round counts as idle
+IDLE_AFTER = 3.0
+# Frames per second in each state (active uses the configured maxfps)
+MENU_FPS = 30
+IDLE_FPS = 10 # Background animation in an idle round
+IDLE_LOOP_FPS = 30 # Event loop in an idle round; kept moderate so input stays prompt
+PAUSED_FPS = 2
+
+class FramePacer(EventDispatcher):
+    """Tracks the render state and sets the Kivy event loop and animation rates to match."""
+
+    state = OptionProperty(MENU, options=[ACTIVE, IDLE, PAUSED, MENU])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Clock._max_fps is internal; without it the loop rate is left alone
+        self.full_fps = getattr(Clock, '_max_fps', 0) or 60
+        self.in_round = False
+        self.window_visible = True
+        self.last_input = 0.0
+        self._idle_check_pending = False
+
+    def start(self):
+        """Starts following window focus and applies the menu rate."""
+        Window.bind(focus=self._on_window_focus, on_minimize=self._on_window_hidden,
+                    on_hide=self._on_window_hidden, on_restore=self._on_window_shown,
+                    on_show=self._on_window_shown)
+        self._apply(self.state)
+
+    def fps_for(self, state) -> float:
+        """Animation rate for a state."""
+        return {ACTIVE: self.full_fps, IDLE: IDLE_FPS, PAUSED: PAUSED_FPS, MENU: MENU_FPS}[state]
+
+    def loop_fps_for(self, state) -> float:
+        """Event loop rate for a state."""
+        if state == IDLE:
+            return min(IDLE_LOOP_FPS, self.full_fps)
+        return self.fps_for(state)
+
+    def enter_round(self):
+        self.in_round = True
+        self.note_input()
+
+    def leave_round(self):
+        self.in_round = False
+        self._update_state()
+
+    def note_input(self):
+        """Called for every key in a round; restores the full rate immediately."""
+        self.last_input = time.monotonic()
+        if self.window_visible and self.state != ACTIVE:
+            self.state = ACTIVE
+        # One pending check at a time instead of rescheduling on every key
+        if not self._idle_check_pending:
+            self._idle_check_pending = True
+            Clock.schedule_once(self._check_idle, IDLE_AFTER)
+
+    def _check_idle(self, dt):
+        remaining = self.last_input + IDLE_AFTER - time.monotonic()
+        if remaining > 0 and self.in_round:
+            Clock.schedule_once(self._check_idle, remaining)
+            return
+        self._idle_check_pending = False
+        if self.state == ACTIVE:
+            self.state = IDLE
+
+    def _update_state(self):
+        if not self.window_visible:
+            self.state = PAUSED
+        elif not self.in_round:
+            self.state = MENU
+        elif self.state != ACTIVE:
+            self.state = IDLE # Back from a pause; the next key makes it active
+
+    def _on_window_focus(self, window, focus):
+        self.window_visible = focus
+        self._update_state()
+
+    def _on_window_hidden(self, *args):
+        self.window_visible = False
+        self._update_state()
+
+    def _on_window_shown(self, *args):
+        self.window_visible = True
+        self._update_state()
+
+    def on_state(self, instance, state):
+        self._apply(state)
+
+    def _apply(self, state):
+        if hasattr(Clock, '_max_fps'):
+            Clock._max_fps = float(self.loop_fps_for(state))
+        if metrics.METRICS_ENABLED:
+            metrics.render_state = state
+
+frame_pacer = FramePacer()
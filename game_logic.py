@@ -1,7 +1,14 @@
 import json
+import math
 import os
+from array import array
 import sys
 import tempfile
+import time
+
+import metrics
+from constants import CONSTANTS, DEFAULT_CONSTANT, ConstantLibrary
+from score_store import ScoreStore
 
 # Helper function to find correct path for packaged resources
 def resource_path(relative_path):
@@ -20,8 +27,12 @@ PI_DIGITS_FILE = resource_path('pi_digits.txt')
 # On Windows: %APPDATA%\piQ
 # On macOS: ~/Library/Application Support/piQ
 # On Linux: ~/.local/share/piQ
+# The PIQ_DATA_DIR environment variable overrides this (kiosks, test harnesses)
 def get_user_data_dir():
     """Get platform-specific user data directory"""
+    override = os.environ.get('PIQ_DATA_DIR')
+    if override:
+        return override
     if sys.platform == 'win32':
         app_data = os.environ.get('APPDATA', '')
         if app_data:
@@ -37,14 +48,199 @@ def get_user_data_dir():
 # Create user data directory if it doesn't exist
 USER_DATA_DIR = get_user_data_dir()
 os.makedirs(USER_DATA_DIR, exist_ok=True)
+# Scores from before player profiles; imported once into the default profile
 HIGH_SCORE_FILE = os.path.join(USER_DATA_DIR, 'high_scores.json')
+# Computed digits of e, √2, φ and τ (see constants.py)
+CONSTANTS_DIR = os.path.join(USER_DATA_DIR, 'constants')
+
+DEFAULT_PROFILE = 'Player'
+MAX_PROFILE_NAME_LENGTH = 24
+
+def clean_profile_name(name: str) -> str:
+    """Trims a player name to something safe to show and store."""
+    name = ' '.join(str(name).split())[:MAX_PROFILE_NAME_LENGTH]
+    return name or DEFAULT_PROFILE
+
+# Round length in seconds for each game mode (None = untimed)
+MODE_DURATIONS = {'Blitz': 30, 'Standard': 180, 'Unlimited': None}
+
+class RoundTimer:
+    """Times a round against a monotonic deadline fixed when the round starts.
+
+    Remaining time is always derived from the clock rather than counted down per
+    tick, so a stalled frame can't make a round last longer than its mode allows.
+    """
+
+    def __init__(self, duration: float | None = None, clock=time.monotonic):
+        self.duration = duration
+        self.clock = clock
+        self.started_at = None
+        self.ended_at = None
+        self.keystrokes = 0
+
+    def start(self):
+        """Starts the round now."""
+        self.started_at = self.clock()
+        self.ended_at = None
+        self.keystrokes = 0
+
+    @property
+    def deadline(self) -> float | None:
+        """Clock time at which the round ends, or None for untimed rounds."""
+        if self.duration is None or self.started_at is None:
+            return None
+        return self.started_at + self.duration
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline (never negative), or None if untimed."""
+        if self.deadline is None:
+            return None
+        end = self.ended_at if self.ended_at is not None else self.clock()
+        return max(self.deadline - end, 0.0)
+
+    def expired(self) -> bool:
+        """True once the deadline has passed, however late anyone checks."""
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def stop(self):
+        """Ends the round, clamping the end time to the deadline."""
+        if self.ended_at is not None:
+            return
+        self.ended_at = self.clock()
+        if self.deadline is not None:
+            self.ended_at = min(self.ended_at, self.deadline)
+
+    def elapsed(self) -> float:
+        """Seconds the round has lasted so far (up to the deadline)."""
+        if self.started_at is None:
+            return 0.0
+        end = self.ended_at if self.ended_at is not None else self.clock()
+        if self.deadline is not None:
+            end = min(end, self.deadline)
+        return end - self.started_at
+
+    def record_keystroke(self):
+        """Counts a key press made during the round."""
+        self.keystrokes += 1
+
+    def keystrokes_per_second(self) -> float:
+        """Average input rate over the round."""
+        elapsed = self.elapsed()
+        return self.keystrokes / elapsed if elapsed > 0 else 0.0
+
+def score_key(mode: str, constant: str = DEFAULT_CONSTANT) -> str:
+    """Store key for a mode's scores; π keeps the plain mode name from before constants."""
+    return mode if constant == DEFAULT_CONSTANT else f"{mode}:{constant}"
+
+# Timers show tenths of a second below this many seconds
+FINAL_SECONDS = 10
+
+def format_remaining(seconds: float | None) -> str:
+    """Formats a round's remaining time as "MM:SS", "00:SS.s" near the end, or "∞"."""
+    if seconds is None:
+        return "∞"
+    # Round up throughout, so a fresh round shows its full length and the
+    # display counts 00:11, 00:10, 00:09.9 without skipping
+    tenths = math.ceil(seconds * 10) / 10
+    if tenths < FINAL_SECONDS:
+        return f"00:{tenths:04.1f}"
+    whole_seconds = math.ceil(seconds)
+    return f"{whole_seconds // 60:02d}:{whole_seconds % 60:02d}"
+
+# Mistakes that end a round in each game mode (None = no limit)
+MODE_MAX_MISTAKES = {'Blitz': None, 'Standard': None, 'Unlimited': 3}
+
+class GameRound:
+    """The rules of a single round, shared by every front end.
+
+    Feed typed characters to submit(); it returns CORRECT, INCORRECT or IGNORED
+    and ends the round when the deadline passes, the mistake limit is reached
+    or the loaded digits run out.
+    """
+
+    CORRECT = 'correct'
+    INCORRECT = 'incorrect'
+    IGNORED = 'ignored' # e.g. a decimal point where a digit is expected
+
+    def __init__(self, game_logic, mode: str, clock=time.monotonic):
+        self.game_logic = game_logic
+        self.mode = mode
+        self.constant = game_logic.constant
+        self.timer = RoundTimer(MODE_DURATIONS.get(mode), clock=clock)
+        self.max_mistakes = MODE_MAX_MISTAKES.get(mode)
+        self.score = 0
+        self.combo = 0
+        self.mistakes = 0
+        self.index = 0 # Position of the next expected character
+        self.active = False
+        self.end_reason = None
+        # Every key submitted during the round, for replay validation (see replay.py)
+        self.log_times_ms = array('I') # Milliseconds since the round started
+        self.log_keys = []
+
+    def start(self):
+        """Starts the round and its timer."""
+        self.active = True
+        self.timer.start()
+
+    def expected_char(self) -> str | None:
+        """The character (digit or '.') the player has to type next."""
+        return self.game_logic.get_pi_digit(self.index)
+
+    def submit(self, char: str, elapsed_ms: int | None = None) -> str:
+        """Checks one typed character against the next expected one.
+
+        elapsed_ms (time since the round started) is read from the clock unless a
+        replay supplies the logged value, so live play and replays agree exactly.
+        """
+        if not self.active:
+            return self.IGNORED
+        if elapsed_ms is None:
+            elapsed_ms = int((self.timer.clock() - self.timer.started_at) * 1000)
+        self.log_times_ms.append(elapsed_ms)
+        self.log_keys.append(char)
+        if self.timer.duration is not None and elapsed_ms >= self.timer.duration * 1000:
+            self.finish("Time's up!")
+            return self.IGNORED
+        self.timer.record_keystroke()
+
+        expected = self.expected_char()
+        # A decimal point only counts where one is expected, and vice versa
+        if (char == '.') != (expected == '.'):
+            return self.IGNORED
+
+        if char == expected:
+            self.score += 1
+            self.combo += 1
+            self.index += 1
+            if self.index >= self.game_logic.get_pi_sequence_length():
+                self.finish("Congratulations! You memorized all loaded digits!")
+            return self.CORRECT
+
+        self.combo = 0
+        self.mistakes += 1
+        if self.max_mistakes is not None and self.mistakes >= self.max_mistakes:
+            self.finish("Too many mistakes!")
+        return self.INCORRECT
+
+    def finish(self, reason: str):
+        """Ends the round (only the first reason is kept)."""
+        if not self.active:
+            return
+        self.active = False
+        self.end_reason = reason
+        self.timer.stop()
 
 class GameLogic:
-    """Handles loading Pi digits and managing high scores."""
+    """Handles loading Pi digits (or another constant's) and managing high scores."""
 
-    def __init__(self):
+    def __init__(self, load_high_scores=True, profile=None):
         self.pi_digits = self._load_pi_digits()
-        self.high_scores = self._load_high_scores()
+        self.constants = ConstantLibrary(CONSTANTS_DIR, self.pi_digits)
+        self.constant = DEFAULT_CONSTANT
+        self.profile = clean_profile_name(profile or os.environ.get('PIQ_PLAYER', ''))
+        # Tools that only need the digits (e.g. the replay validator) skip the score store
+        self.score_store = self._load_high_scores() if load_high_scores else None
 
     def _load_pi_digits(self) -> str:
         """Loads the digits of Pi from the text file, keeping the decimal point."""
@@ -66,55 +262,92 @@ class GameLogic:
             print(f"Error reading {PI_DIGITS_FILE}: {e}")
             return "3.14159"
 
-    def _load_high_scores(self) -> dict:
-        """Loads high scores from the JSON file."""
-        if not os.path.exists(HIGH_SCORE_FILE):
-            # Create the file with default scores if it doesn't exist
-            default_scores = {'Blitz': 0, 'Standard': 0, 'Unlimited': 0}
-            self._save_high_scores(default_scores)
-            return default_scores
-        try:
-            with open(HIGH_SCORE_FILE, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError, Exception) as e:
-            print(f"Error loading high scores from {HIGH_SCORE_FILE}: {e}")
-            # Return default scores in case of error
-            return {'Blitz': 0, 'Standard': 0, 'Unlimited': 0}
-
-    def _save_high_scores(self, scores: dict):
-        """Saves high scores to the JSON file."""
+    def _load_high_scores(self) -> ScoreStore:
+        """Opens the shared score store, importing the old high_scores.json once."""
+        store = ScoreStore(USER_DATA_DIR)
+        if os.path.exists(HIGH_SCORE_FILE) and not os.path.exists(store.log_path):
+            try:
+                with open(HIGH_SCORE_FILE, 'r') as f:
+                    legacy_scores = json.load(f)
+                store.import_scores(DEFAULT_PROFILE, {mode: score for mode, score in legacy_scores.items() if score})
+            except (OSError, json.JSONDecodeError, TypeError, ValueError) as e:
+                print(f"Error importing high scores from {HIGH_SCORE_FILE}: {e}")
+        return store
+
+    def _save_high_scores(self, mode: str, score: int, run_path=None):
+        """Saves a new best score for the current profile to the shared store."""
+        run = os.path.basename(run_path) if run_path else None
         try:
-            with open(HIGH_SCORE_FILE, 'w') as f:
-                json.dump(scores, f, indent=4)
-        except Exception as e:
-            print(f"Error saving high scores to {HIGH_SCORE_FILE}: {e}")
+            if self.score_store.record_score(self.profile, self.score_key(mode), score, run):
+                metrics.high_score_writes.inc()
+        except OSError as e:
+            print(f"Error saving high score to {self.score_store.log_path}: {e}")
+
+    @property
+    def high_scores(self) -> dict:
+        """The current profile's best score in every mode."""
+        return {mode: self.get_high_score(mode) for mode in MODE_DURATIONS}
+
+    def set_profile(self, name: str):
+        """Switches the player whose scores are shown and saved."""
+        self.profile = clean_profile_name(name)
+
+    def score_key(self, mode: str) -> str:
+        """Store key for a mode's scores with the selected constant."""
+        return score_key(mode, self.constant)
+
+    def set_constant(self, key: str, compute=True):
+        """Switches the constant the rounds are played with.
+
+        With compute=True, missing digits are computed in the background; the
+        available digits grow as each stage finishes.
+        """
+        if key not in CONSTANTS:
+            raise ValueError(f"Unknown constant {key!r}")
+        self.constant = key
+        if compute:
+            self.constants.request(key)
+
+    @property
+    def digits(self) -> str:
+        """The selected constant's digits available so far, e.g. "2.71828..."."""
+        return self.constants.get(self.constant)
 
     def get_high_score(self, mode: str) -> int:
-        """Gets the high score for a specific game mode."""
-        return self.high_scores.get(mode, 0)
+        """Gets the current profile's high score for a specific game mode."""
+        if self.score_store is None:
+            return 0
+        try:
+            return self.score_store.get_high_score(self.profile, self.score_key(mode))
+        except OSError as e:
+            print(f"Error reading high scores from {self.score_store.log_path}: {e}")
+            return 0
+
+    def update_high_score(self, mode: str, score: int, run_path=None):
+        """Updates the high score if the new score is higher.
 
-    def update_high_score(self, mode: str, score: int):
-        """Updates the high score if the new score is higher."""
-        if score > self.get_high_score(mode):
-            self.high_scores[mode] = score
-            self._save_high_scores(self.high_scores)
+        run_path is the round's saved run log (see replay.save_run), which backs the score.
+        """
+        if self.score_store is not None and score > self.get_high_score(mode):
+            self._save_high_scores(mode, score, run_path)
 
     def get_pi_digit(self, index: int) -> str | None:
-        """Returns the Pi character (digit or '.') at the given index (0-based)."""
-        if 0 <= index < len(self.pi_digits):
-            return self.pi_digits[index]
+        """Returns the selected constant's character (digit or '.') at the given index (0-based)."""
+        digits = self.digits
+        if 0 <= index < len(digits):
+            return digits[index]
         return None
 
     def get_pi_sequence_length(self) -> int:
-        """Returns the total number of loaded Pi digits."""
-        return len(self.pi_digits)
+        """Returns the number of characters of the selected constant available so far."""
+        return len(self.digits)
 
 # Example usage (optional, for testing)
 if __name__ == '__main__':
     logic = GameLogic()
     print(f"Loaded {logic.get_pi_sequence_length()} digits of Pi.")
     print(f"First 10 digits: {logic.pi_digits[:10]}")
-    print(f"High scores: {logic.high_scores}")
+    print(f"High scores for {logic.profile}: {logic.high_scores}")
     logic.update_high_score('Standard', 150)
     print(f"Updated Standard high score: {logic.get_high_score('Standard')}")
     print(f"Digit at index 0: {logic.get_pi_digit(0)}")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Long-session leak regression for πQ.
+
+Runs the real app, pushes synthetic keystrokes (mostly correct, some wrong)
+through GameScreen.handle_input in batches, lets animations finish between
+batches and samples live widgets, Animations, canvas instructions and traced
+memory. Rounds are timed on a simulated clock that moves KEY_INTERVAL per
+keystroke, like replay.py's, so a Standard round takes the same number of keys
+however slowly this machine renders them. Only keys the round accepted count
+towards --keystrokes. Rounds are restarted whenever they end (time up or the
+loaded digits run out), so round setup/teardown is exercised too. Exits with
+status 1 if any of those keep growing instead of levelling off.
+
+Usage: python leak_check.py [--keystrokes 100000] [--batch 1000] [--smoke]
+
+Each keystroke spawns real widgets and animations, so the default 100k run
+is a soak test that takes around an hour without a hardware GL driver.
+--smoke is a run of a minute or two that ends the round after every batch
+with PIQ_MEMSTATS reporting on. It can't judge growth from so few samples,
+but it exercises every sampling and teardown path, so it catches crashes.
+"""
+
+import os
+import sys
+import argparse
+import contextlib
+import random
+import tempfile
+import tracemalloc
+
+# Keep Kivy from parsing our arguments and keep the run away from real high scores
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('PIQ_DATA_DIR', tempfile.mkdtemp(prefix='piq_leak_check_'))
+
+from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.uix.screenmanager import NoTransition
+
+from main import PiQApp
+from memory_stats import MemoryMonitor, memory_monitor
+
+# Fraction of samples treated as warm-up (caches, first-round allocations)
+WARMUP_FRACTION = 0.2
+# Growth allowed between the first and last quarter of the measured samples
+ALLOWED_GROWTH = {
+    'widgets': 50,
+    'animations': 5,
+    'canvas_instructions': 500,
+    'traced_bytes': 2 * 1024 * 1024,
+}
+# Share of keystrokes that are deliberately wrong
+ERROR_RATE = 0.2
+# Keystrokes and batch size of a --smoke run
+SMOKE_KEYSTROKES = 3000
+SMOKE_BATCH = 500
+# Simulated seconds between keystrokes; a Standard round lasts 1200 of them
+KEY_INTERVAL = 0.15
+
+class SyntheticClock:
+    """Round clock that only moves when the harness sends a key."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class LeakCheckApp(PiQApp):
+    """PiQApp that drives a Standard round with synthetic input instead of a player."""
+
+    def __init__(self, keystrokes, batch, restart_each_batch=False, **kwargs):
+        super().__init__(**kwargs)
+        self.keystrokes_left = keystrokes
+        self.batch = batch
+        self.restart_each_batch = restart_each_batch
+        self.monitor = MemoryMonitor(enabled=False)
+        self.samples = []
+        self.rounds = 0
+        self.clock = SyntheticClock()
+
+    def on_start(self):
+        tracemalloc.start()
+        self.root.transition = NoTransition()
+        Clock.schedule_once(self._start_round, 0)
+
+    def _start_round(self, dt):
+        """Enters the game screen the same way the countdown does."""
+        self.rounds += 1
+        self.selected_game_mode = 'Standard'
+        self.root.current = 'game'
+        Clock.schedule_once(self._wait_for_round_start, 0)
+
+    def _wait_for_round_start(self, dt):
+        """Waits for setup_game, then moves the round onto the synthetic clock."""
+        screen = self.root.get_screen('game')
+        if not screen.game_active:
+            Clock.schedule_once(self._wait_for_round_start, 0)
+            return
+        screen.round.timer.clock = self.clock
+        screen.round.timer.start()
+        Clock.schedule_once(self._push_batch, 0)
+
+    def _push_batch(self, dt):
+        screen = self.root.get_screen('game')
+        timer = screen.round.timer
+        sent = 0
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # The round ends itself when time is up or the digits run out
+            while sent < min(self.batch, self.keystrokes_left) and screen.game_active:
+                expected = self.game_logic.get_pi_digit(screen.current_digit_index)
+                self.clock.now += KEY_INTERVAL
+                before = timer.keystrokes
+                if expected.isdigit() and random.random() < ERROR_RATE:
+                    screen.handle_input(str((int(expected) + random.randint(1, 9)) % 10))
+                else:
+                    screen.handle_input(expected)
+                # A key that arrives after the deadline is ignored, so it doesn't count
+                sent += timer.keystrokes - before
+            if screen.game_active and self.restart_each_batch:
+                # A smoke run: finish the round and start a fresh one
+                screen.end_game("Leak check restart")
+        self.keystrokes_left -= sent
+        Clock.schedule_once(self._wait_for_animations, 0)
+
+    def _wait_for_animations(self, dt):
+        """Polls each frame until particles and shakes have finished, then samples."""
+        if Animation._instances:
+            Clock.schedule_once(self._wait_for_animations, 0)
+            return
+        self.samples.append(self.monitor.take_sample(self.root.screens))
+        if self.keystrokes_left <= 0:
+            self.stop()
+        elif self.root.get_screen('game').game_active:
+            Clock.schedule_once(self._push_batch, 0)
+        else:
+            Clock.schedule_once(self._start_round, 0)
+
+def check_growth(samples) -> list:
+    """Returns a description of every metric that grew more than allowed."""
+    measured = samples[int(len(samples) * WARMUP_FRACTION):]
+    quarter = max(len(measured) // 4, 1)
+    failures = []
+    for metric, allowed in ALLOWED_GROWTH.items():
+        first = sum(s[metric] for s in measured[:quarter]) / quarter
+        last = sum(s[metric] for s in measured[-quarter:]) / quarter
+        growth = last - first
+        status = "FAIL" if growth > allowed else "ok"
+        print(f"{metric:<20}{first:>14.0f}{last:>14.0f}{growth:>+14.0f}  {status}")
+        if growth > allowed:
+            failures.append(f"{metric} grew by {growth:.0f} (allowed {allowed})")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a long πQ session leaks memory or objects.")
+    parser.add_argument("--keystrokes", type=int, default=100000, help="synthetic keystrokes to send")
+    parser.add_argument("--batch", type=int, default=1000, help="keystrokes sent between samples")
+    parser.add_argument("--smoke", action="store_true",
+                        help=f"quick crash check: {SMOKE_KEYSTROKES} keystrokes, a new round every "
+                             f"{SMOKE_BATCH}, PIQ_MEMSTATS reporting on, no growth verdict")
+    args = parser.parse_args()
+
+    if args.smoke:
+        args.keystrokes, args.batch = SMOKE_KEYSTROKES, SMOKE_BATCH
+        memory_monitor.enabled = True # Exercise the per-round report the game prints too
+
+    app = LeakCheckApp(args.keystrokes, args.batch, restart_each_batch=args.smoke)
+    app.run()
+
+    print(f"{app.rounds} rounds, {len(app.samples)} samples")
+    if args.smoke:
+        if not app.samples or app.keystrokes_left > 0:
+            print("Smoke run FAILED: the session ended before every keystroke was sent.")
+            sys.exit(1)
+        print("Smoke run passed.")
+        return
+    print(f"{'Metric':<20}{'Start':>14}{'End':>14}{'Growth':>14}")
+    failures = check_growth(app.samples)
+    if failures:
+        print("Leak check FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("Leak check passed.")
+
+if __name__ == "__main__":
+    main()
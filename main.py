@@ -1,3 +1,21 @@
+import multiprocessing
+import os
+import sys
+
+# Packaged builds re-launch the executable for constant-computing pool workers
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+
+# The terminal front end must start without loading Kivy at all
+if __name__ == '__main__' and '--terminal' in sys.argv[1:]:
+    from terminal_ui import main as terminal_main
+    sys.exit(terminal_main())
+
+# Round tracing (see round_profiler.py); removed from argv before Kivy parses it
+if __name__ == '__main__' and '--trace' in sys.argv[1:]:
+    sys.argv.remove('--trace')
+    os.environ['PIQ_TRACE'] = '1'
+
 import kivy
 kivy.require('2.3.0') # Replace with your Kivy version if needed
 
@@ -6,11 +24,12 @@ from kivy.uix.screenmanager import ScreenManager
 from kivy.lang import Builder
 from kivy.core.window import Window
 from kivy.resources import resource_add_path
-import os
-import sys
 
 # Import game_logic with its resource_path helper function
 from game_logic import GameLogic, resource_path
+import audio
+import metrics
+from frame_pacing import frame_pacer
 # Import screen classes
 from screens.landing_screen import LandingScreen
 from screens.countdown_screen import CountdownScreen
@@ -48,7 +67,28 @@ class PiQApp(App):
 
         # LandingScreen.on_enter handles high score display
 
+        # Opt-in telemetry (PIQ_METRICS_PORT / PIQ_METRICS_FILE)
+        metrics.start()
+        # Lower the event loop rate whenever nothing animates continuously
+        frame_pacer.start()
+        # Key sounds are generated and loaded once, never per keystroke
+        audio.start()
+
         return sm
 
+    def on_start(self):
+        """Quits right after the first frame when launched by `build.py --benchmark`."""
+        if os.environ.get('PIQ_LAUNCH_PROBE'):
+            Window.bind(on_flip=self._stop_after_first_frame)
+
+    def _stop_after_first_frame(self, window):
+        window.unbind(on_flip=self._stop_after_first_frame)
+        self.stop()
+
+    def on_stop(self):
+        """Flushes the metrics textfile and stops constant computations on exit."""
+        metrics.stop()
+        self.game_logic.constants.shutdown()
+
 if __name__ == '__main__':
     PiQApp().run() 
\ No newline at end of file
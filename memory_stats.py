@@ -0,0 +1,105 @@
+"""
+Memory and object-count instrumentation for long πQ sessions.
+
+Set PIQ_MEMSTATS=1 to print, at the end of each round,
+the number of live widgets, running Animations and canvas instructions along
+with the biggest tracemalloc allocation changes since the previous round.
+"""
+
+import gc
+import tracemalloc
+
+from utils import env_flag
+
+MEMSTATS_ENABLED = env_flag('PIQ_MEMSTATS')
+
+# Frames kept per traceback; 1 is enough for per-line diffs and keeps overhead low
+TRACE_FRAMES = 1
+
+def count_canvas_instructions(group, skip=frozenset()) -> int:
+    """Counts graphics instructions in a canvas, including nested groups.
+
+    Groups whose id() is in skip (other widgets' canvases) are left out.
+    """
+    count = 0
+    for instruction in group.children:
+        if id(instruction) in skip:
+            continue
+        count += 1
+        if hasattr(instruction, 'children'):
+            count += count_canvas_instructions(instruction, skip)
+    # Canvas.before/after are created on first access, so only walk existing ones
+    if getattr(group, 'has_before', False):
+        count += count_canvas_instructions(group.before, skip)
+    if getattr(group, 'has_after', False):
+        count += count_canvas_instructions(group.after, skip)
+    return count
+
+def count_widget_instructions(root_widgets) -> int:
+    """Counts the canvas instructions of every widget under the given roots.
+
+    Each widget's canvas (with its before/after groups) is counted once, even when
+    it isn't attached to its parent's canvas, e.g. a ScreenManager's inactive screens.
+    """
+    widgets = [widget for root in root_widgets for widget in root.walk(restrict=True)]
+    widget_canvases = frozenset(id(widget.canvas) for widget in widgets)
+    return sum(count_canvas_instructions(widget.canvas, widget_canvases) for widget in widgets)
+
+def count_live_objects(root_widgets=()) -> dict:
+    """Returns live widget, Animation and canvas instruction counts."""
+    # Imported lazily so this module can be loaded without starting Kivy
+    from kivy.animation import Animation
+    from kivy.uix.widget import Widget
+
+    # issubclass(type(...)) because isinstance() on a dead Kivy WeakProxy raises ReferenceError
+    widgets = sum(1 for obj in gc.get_objects() if issubclass(type(obj), Widget))
+    instructions = count_widget_instructions(root_widgets)
+    return {
+        'widgets': widgets,
+        'animations': len(Animation._instances),
+        'canvas_instructions': instructions,
+    }
+
+class MemoryMonitor:
+    """Collects object counts and tracemalloc snapshots between rounds."""
+
+    def __init__(self, enabled=MEMSTATS_ENABLED, top=10):
+        self.enabled = enabled
+        self.top = top
+        self.round_number = 0
+        self._last_snapshot = None
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+
+    def take_sample(self, root_widgets=()) -> dict:
+        """Returns object counts plus current/peak traced memory in bytes."""
+        gc.collect()
+        sample = count_live_objects(root_widgets)
+        if tracemalloc.is_tracing():
+            sample['traced_bytes'], sample['traced_peak_bytes'] = tracemalloc.get_traced_memory()
+        return sample
+
+    def report_round(self, root_widgets=()):
+        """Prints object counts and the top allocation changes since the last round."""
+        if not self.enabled:
+            return None
+
+        self.round_number += 1
+        sample = self.take_sample(root_widgets)
+        print(f"[memstats] Round {self.round_number}: "
+              f"widgets={sample['widgets']} animations={sample['animations']} "
+              f"canvas_instructions={sample['canvas_instructions']} "
+              f"traced={sample.get('traced_bytes', 0) / 1024:.1f} KiB")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        if self._last_snapshot is not None:
+            for stat in snapshot.compare_to(self._last_snapshot, 'lineno')[:self.top]:
+                print(f"[memstats]   {stat}")
+        self._last_snapshot = snapshot
+        return sample
+
+# Shared monitor used by the game screens
+memory_monitor = MemoryMonitor()
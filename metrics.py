@@ -0,0 +1,238 @@
+"""
+Opt-in OpenMetrics telemetry for πQ stations.
+
+Set PIQ_METRICS_PORT to serve the metrics at http://127.0.0.1:<port>/metrics,
+and/or PIQ_METRICS_FILE to rewrite a textfile (e.g. for node_exporter's textfile
+collector) every PIQ_METRICS_INTERVAL seconds (default 15).
+
+Metrics are only ever updated from the Kivy main thread, so an update is a
+plain increment with no locking. The exporter threads only read them.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+from utils import atomic_write
+
+DEFAULT_METRICS_INTERVAL = 15.0
+
+def _interval_from_env() -> float:
+    """PIQ_METRICS_INTERVAL in seconds; a malformed value falls back to the default."""
+    value = os.environ.get('PIQ_METRICS_INTERVAL', '').strip()
+    if not value:
+        return DEFAULT_METRICS_INTERVAL
+    try:
+        interval = float(value)
+    except ValueError:
+        interval = 0.0
+    if not interval > 0 or interval == float('inf'): # Also rejects NaN
+        print(f"Warning: Invalid PIQ_METRICS_INTERVAL {value!r}, using {DEFAULT_METRICS_INTERVAL:g} seconds.")
+        return DEFAULT_METRICS_INTERVAL
+    return interval
+
+METRICS_PORT = os.environ.get('PIQ_METRICS_PORT')
+METRICS_FILE = os.environ.get('PIQ_METRICS_FILE')
+METRICS_INTERVAL = _interval_from_env()
+METRICS_ENABLED = bool(METRICS_PORT or METRICS_FILE)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+REGISTRY = []
+
+def _format_labels(labelnames, labelvalues, extra=None) -> str:
+    """Formats label pairs as {name="value",...}, or '' when there are none."""
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class Counter:
+    """A monotonically increasing count, optionally split by label values."""
+
+    def __init__(self, name, documentation, labelnames=(), initial_labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Label values -> count; pre-seeded so idle series are exported as 0
+        self._values = {tuple(labels): 0 for labels in initial_labels}
+        if not self.labelnames:
+            self._values[()] = 0
+        REGISTRY.append(self)
+
+    def inc(self, *labelvalues, amount=1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def get(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> list:
+        lines = [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.documentation}"]
+        for labelvalues, value in sorted(list(self._values.items())):
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+class CallbackCounter(Counter):
+    """A counter whose total is read from a function at export time."""
+
+    def __init__(self, name, documentation, function):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def get(self, *labelvalues):
+        return self.function()
+
+    def render(self) -> list:
+        return [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.documentation}",
+                f"{self.name}_total {self.function()}"]
+
+class Histogram:
+    """Counts observations in fixed cumulative buckets, plus their sum."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1) # Last slot is +Inf
+        self._sum = 0.0
+        REGISTRY.append(self)
+
+    def observe(self, value):
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sum += value
+
+    def render(self) -> list:
+        counts = list(self._counts)
+        total = self._sum
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.documentation}"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + [float('inf')], counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            lines.append(f"{self.name}_bucket{_format_labels((), (), ('le', le))} {cumulative}")
+        lines.append(f"{self.name}_count {cumulative}")
+        lines.append(f"{self.name}_sum {total}")
+        return lines
+
+# --- Gameplay metrics ---
+keystrokes = Counter('piq_keystrokes', 'Key presses received by the game screen.')
+inputs = Counter('piq_inputs', 'Digits checked against the expected digit.', ['result'],
+                 initial_labels=[('correct',), ('incorrect',)])
+rounds = Counter('piq_rounds', 'Rounds finished, by game mode.', ['mode'],
+                 initial_labels=[('Blitz',), ('Standard',), ('Unlimited',)])
+high_score_writes = Counter('piq_high_score_writes', 'New best scores written to the score store.')
+
+# --- Performance metrics ---
+loop_wakeups = Counter('piq_loop_wakeups', 'Kivy event loop iterations, by frame pacing state.', ['state'],
+                       initial_labels=[('active',), ('idle',), ('paused',), ('menu',)])
+process_cpu = CallbackCounter('process_cpu_seconds', 'CPU time used by the game process.', time.process_time)
+frame_time = Histogram('piq_frame_time_seconds', 'Time between Kivy clock ticks.',
+                       [0.008, 0.016, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0])
+key_to_frame_latency = Histogram('piq_key_to_frame_latency_seconds',
+                                 'Time from a key press to the next drawn frame.',
+                                 [0.005, 0.01, 0.016, 0.033, 0.05, 0.1, 0.25, 0.5])
+round_duration = Histogram('piq_round_duration_seconds', 'Wall-clock length of finished rounds.',
+                           [10, 30, 60, 120, 180, 300, 600, 1800, 3600])
+round_keystroke_rate = Histogram('piq_round_keystrokes_per_second', 'Average input rate of finished rounds.',
+                                 [0.5, 1, 2, 3, 4, 5, 6, 8, 10, 15])
+
+def render_openmetrics() -> str:
+    """Returns every registered metric in the OpenMetrics text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+# Key press timestamps waiting for the frame that shows their result
+_pending_keys = []
+
+def record_keystroke():
+    """Counts a key press and starts timing it until the next drawn frame."""
+    keystrokes.inc()
+    _pending_keys.append(time.perf_counter())
+
+# Current frame_pacing state, kept here so counting a wakeup is a single increment
+render_state = 'menu'
+
+def _on_frame_tick(dt):
+    frame_time.observe(dt)
+    loop_wakeups.inc(render_state)
+
+def _on_flip(window):
+    if _pending_keys:
+        now = time.perf_counter()
+        for pressed_at in _pending_keys:
+            key_to_frame_latency.observe(now - pressed_at)
+        _pending_keys.clear()
+
+def write_textfile(path=None):
+    """Atomically rewrites the metrics textfile."""
+    path = path or METRICS_FILE
+    try:
+        with atomic_write(path) as f:
+            f.write(render_openmetrics())
+    except OSError as e:
+        print(f"Error writing metrics to {path}: {e}")
+
+def _textfile_loop(stop_event):
+    while not stop_event.wait(METRICS_INTERVAL):
+        write_textfile()
+
+def _serve_http(port):
+    # Imported here so stations without metrics never pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_openmetrics().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Keep scrapes out of the console
+
+    try:
+        server = ThreadingHTTPServer(('127.0.0.1', int(port)), MetricsHandler)
+    except (OSError, ValueError) as e:
+        print(f"Error starting metrics endpoint on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name='piq-metrics-http', daemon=True).start()
+    print(f"Serving metrics at http://127.0.0.1:{server.server_address[1]}/metrics")
+    return server
+
+_stop_event = threading.Event()
+
+def start():
+    """Installs the frame hooks and starts the configured exporters."""
+    if not METRICS_ENABLED:
+        return
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+
+    Clock.schedule_interval(_on_frame_tick, 0)
+    Window.bind(on_flip=_on_flip)
+    if METRICS_PORT:
+        _serve_http(METRICS_PORT)
+    if METRICS_FILE:
+        threading.Thread(target=_textfile_loop, args=(_stop_event,),
+                         name='piq-metrics-textfile', daemon=True).start()
+
+def stop():
+    """Stops the textfile exporter after writing the final values."""
+    if not METRICS_ENABLED:
+        return
+    _stop_event.set()
+    if METRICS_FILE:
+        write_textfile()
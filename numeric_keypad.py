@@ -0,0 +1,132 @@
+"""
+On-screen numeric keypad for touch devices.
+
+The whole keypad is one widget drawn on a single canvas: a rounded rectangle
+and a pre-rendered label texture per key, laid out once per resize. Keys fire
+on touch-down (not release) through the on_key_press event, and every touch is
+tracked by its uid so fast two-thumb input never drops a key.
+
+The keypad replaces the OS soft keyboard on Android and iOS, where it adds
+input latency and covers the digits. Set PIQ_KEYPAD=1 or PIQ_KEYPAD=0 to force
+it on or off.
+"""
+
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle, RoundedRectangle
+from kivy.metrics import dp, sp
+from kivy.uix.widget import Widget
+from kivy.utils import platform
+
+from utils import env_flag
+
+def keypad_enabled() -> bool:
+    """Whether the game should use the keypad instead of the OS keyboard."""
+    # Kivy can't tell if a tablet has a hardware keyboard; mobile platforms rarely do
+    return env_flag('PIQ_KEYPAD', default=platform in ('android', 'ios'))
+
+KEYPAD_ENABLED = keypad_enabled()
+
+class NumericKeypad(Widget):
+    """A 0-9 and '.' keypad that dispatches on_key_press(char) on touch-down."""
+
+    # (char, column, row, column span); row 0 is the top row
+    KEYS = [
+        ('1', 0, 0, 1), ('2', 1, 0, 1), ('3', 2, 0, 1),
+        ('4', 0, 1, 1), ('5', 1, 1, 1), ('6', 2, 1, 1),
+        ('7', 0, 2, 1), ('8', 1, 2, 1), ('9', 2, 2, 1),
+        ('.', 0, 3, 1), ('0', 1, 3, 2),
+    ]
+    COLUMNS = 3
+    ROWS = 4
+    KEY_SPACING = dp(6)
+
+    # Colors
+    KEY_COLOR = [0.2, 0.2, 0.2, 1]
+    PRESSED_COLOR = [0.2, 0.6, 0.8, 1] # Professional Blue
+    TEXT_COLOR = [1, 1, 1, 1]
+
+    __events__ = ('on_key_press',)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._key_colors = []
+        self._key_rects = []
+        self._label_rects = []
+        self._pressed = {} # touch.uid -> index of the key it pressed
+        with self.canvas:
+            for char, _, _, _ in self.KEYS:
+                self._key_colors.append(Color(rgba=self.KEY_COLOR))
+                self._key_rects.append(RoundedRectangle(radius=[dp(8)]))
+                Color(rgba=self.TEXT_COLOR)
+                self._label_rects.append(Rectangle())
+        self.bind(pos=self._layout_keys, size=self._layout_keys)
+
+    def _key_bounds(self, index):
+        """(x, y, width, height) of a key inside the widget."""
+        _, column, row, span = self.KEYS[index]
+        cell_w = self.width / self.COLUMNS
+        cell_h = self.height / self.ROWS
+        half_spacing = self.KEY_SPACING / 2
+        x = self.x + column * cell_w + half_spacing
+        y = self.top - (row + 1) * cell_h + half_spacing
+        return x, y, span * cell_w - self.KEY_SPACING, cell_h - self.KEY_SPACING
+
+    def _layout_keys(self, *args):
+        """Positions every key and re-renders the labels to fit the key height."""
+        font_size = max(self.height / self.ROWS * 0.45, sp(12))
+        for index, (char, _, _, _) in enumerate(self.KEYS):
+            x, y, w, h = self._key_bounds(index)
+            self._key_rects[index].pos = (x, y)
+            self._key_rects[index].size = (max(w, 0), max(h, 0))
+            label = CoreLabel(text=char, font_size=font_size, bold=True)
+            label.refresh()
+            texture = label.texture
+            label_rect = self._label_rects[index]
+            label_rect.texture = texture
+            label_rect.size = texture.size
+            label_rect.pos = (x + (w - texture.width) / 2, y + (h - texture.height) / 2)
+
+    def key_at(self, x, y):
+        """Index of the key under a point, or None (including the gaps)."""
+        for index in range(len(self.KEYS)):
+            key_x, key_y, w, h = self._key_bounds(index)
+            if key_x <= x < key_x + w and key_y <= y < key_y + h:
+                return index
+        return None
+
+    def on_touch_down(self, touch):
+        if self.disabled or not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if touch.is_mouse_scrolling:
+            return False
+        index = self.key_at(*touch.pos)
+        if index is None:
+            return True # A gap between keys; swallow it so nothing behind reacts
+        touch.grab(self)
+        self._pressed[touch.uid] = index
+        self._key_colors[index].rgba = self.PRESSED_COLOR
+        self.dispatch('on_key_press', self.KEYS[index][0])
+        return True
+
+    def on_touch_move(self, touch):
+        # Sliding a finger doesn't press other keys; each press is one touch-down
+        return touch.grab_current is self or super().on_touch_move(touch)
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        index = self._pressed.pop(touch.uid, None)
+        # Another finger may still be holding the same key
+        if index is not None and index not in self._pressed.values():
+            self._key_colors[index].rgba = self.KEY_COLOR
+        return True
+
+    def release_all(self):
+        """Clears pressed highlights, e.g. when the round ends mid-press."""
+        for index in set(self._pressed.values()):
+            self._key_colors[index].rgba = self.KEY_COLOR
+        self._pressed.clear()
+
+    def on_key_press(self, char):
+        pass
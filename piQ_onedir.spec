@@ -0,0 +1,81 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Fast-launching build: unpacked one-directory bundle, no UPX, and only the
+# Kivy providers the game actually uses. Built by `python build.py --mode onedir`.
+
+import os
+
+from kivy.tools.packaging.pyinstaller_hooks import get_deps_minimal, hookspath, runtime_hooks
+
+block_cipher = None
+
+# The game needs a window, text rendering, images and SDL2 audio for key sounds; skip the rest
+kivy_deps = get_deps_minimal(video=None, camera=None, audio='sdl2', spelling=None)
+
+# Modules Kivy can pull in that the game never imports
+extra_excludes = [
+    'tkinter',
+    'docutils',
+    'pygments',
+    'kivy.lib.gstplayer',
+    'kivy.uix.camera',
+    'kivy.uix.codeinput',
+    'kivy.uix.rst',
+    'kivy.uix.video',
+    'kivy.uix.videoplayer',
+]
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=kivy_deps['binaries'],
+    datas=[
+        ('pi_digits.txt', '.'),
+        ('piq.kv', '.'),
+        ('high_scores.json', '.') if os.path.exists('high_scores.json') else ('', ''),
+    ],
+    hiddenimports=['kivy.weakproxy', 'kivy.uix.boxlayout'] + kivy_deps['hiddenimports'],
+    hookspath=hookspath(),
+    hooksconfig={},
+    runtime_hooks=runtime_hooks(),
+    excludes=kivy_deps['excludes'] + extra_excludes,
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+# Include Kivy dependencies
+from kivy_deps import sdl2, glew
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='piQ',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False, # Decompressing UPX binaries on every launch costs more than it saves
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon='icon.ico' if os.path.exists('icon.ico') else None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    *[Tree(p) for p in (sdl2.dep_bins + glew.dep_bins)],
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='piQ',
+)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+"""
+Keystroke logs for finished rounds and a batch validator for submitted runs.
+
+Every finished round is saved as a small JSON run file under USER_DATA_DIR/runs:
+
+    {"version": 1, "mode": "Blitz", "score": 57, "keys": "3.14159...",
+     "intervals": "<base64 LEB128 varints>", "keystrokes_per_second": 2.4,
+     "player": "Player", "constant": "pi"}
+
+"keys" holds every character submitted during the round, and "intervals" holds
+the milliseconds from the round start to the first key, then between each pair
+of keys. "keystrokes_per_second" is the round's average input rate (for
+statistics only; the validator ignores it). "player" is the profile the score
+was saved under, and "constant" the digits played (see constants.py; runs
+without it are π). The validator replays the keys through GameRound on a
+simulated clock, so the real game rules decide the score, the mode's deadline
+and the mistake limit. It also rejects input no person can produce: a burst of
+BURST_KEYS keys faster than MAX_KEYS_PER_SECOND, or with more than
+MAX_CLOSE_PAIRS_PER_BURST keys sooner than MIN_KEY_INTERVAL_MS after the
+previous one. A single close pair is normal (two thumbs on the keypad, keyboard
+rollover); a script sending keys in 0 ms chunks makes one after almost every
+key. A held key auto-repeating (the same key again, at least AUTO_REPEAT_MIN_MS
+apart) is exempt from the burst check, so a genuine player leaning on a key
+isn't mistaken for a script, but the same key twice sooner than that is
+rejected outright.
+
+Every stored best score names the run file it came from (see score_store.py).
+The scores command replays those runs and rejects any best whose run is
+missing, belongs to another player, mode or score, or fails validation, so a
+hand-edited score log doesn't go unnoticed.
+
+Usage:
+    python replay.py validate PATH [PATH ...] [--workers N]
+    python replay.py scores [--profile NAME]
+
+PATH may be a run file, a .jsonl file with one run per line, or a directory
+(searched recursively for both). Paths that are missing or can't be read are
+reported as rejected entries. Without a PATH the saved runs in RUNS_DIR are
+checked, and none saved yet means nothing to check.
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+from constants import CONSTANTS, DEFAULT_CONSTANT
+from game_logic import GameLogic, GameRound, MODE_DURATIONS, USER_DATA_DIR, score_key
+from score_store import ScoreStore
+
+RUN_FORMAT_VERSION = 1
+RUNS_DIR = os.path.join(USER_DATA_DIR, 'runs')
+
+# A burst of BURST_KEYS keys faster than this rate is treated as scripted input
+MAX_KEYS_PER_SECOND = 20
+BURST_KEYS = 10
+# Two different keys closer together than this only happen by rolling over from
+# one key to the next, which players do now and then but not after every key
+MIN_KEY_INTERVAL_MS = 30
+MAX_CLOSE_PAIRS_PER_BURST = 3
+# OS auto-repeat of a held key: the same key again, this far apart or more,
+# faster than MAX_REPEAT_INTERVAL_MS (repeat rates top out around 30-40 keys/s)
+AUTO_REPEAT_MIN_MS = 25
+MAX_REPEAT_INTERVAL_MS = 60
+
+def encode_varints(values) -> str:
+    """Packs non-negative integers as base64-encoded LEB128 varints."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+def decode_varints(text: str) -> list:
+    """Inverse of encode_varints()."""
+    values = []
+    value = shift = 0
+    for byte in base64.b64decode(text.encode('ascii'), validate=True):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    if shift:
+        raise ValueError("truncated interval data")
+    return values
+
+def encode_run(round_: GameRound, profile=None) -> dict:
+    """Returns the compact run record for a finished round."""
+    times = round_.log_times_ms
+    intervals = [times[0]] + [b - a for a, b in zip(times, times[1:])] if times else []
+    run = {
+        'version': RUN_FORMAT_VERSION,
+        'mode': round_.mode,
+        'score': round_.score,
+        'keys': ''.join(round_.log_keys),
+        'intervals': encode_varints(intervals),
+        'keystrokes_per_second': round(round_.timer.keystrokes_per_second(), 2),
+        'constant': round_.constant,
+    }
+    if profile:
+        run['player'] = profile
+    return run
+
+def save_run(round_: GameRound, directory=RUNS_DIR, profile=None) -> str | None:
+    """Writes the run record for a finished round and returns its path."""
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{round_.mode}-{round_.score}.json"
+    path = os.path.join(directory, name)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(encode_run(round_, profile), f, separators=(',', ':'))
+        return path
+    except OSError as e:
+        print(f"Error saving run log to {path}: {e}")
+        return None
+
+class _ReplayClock:
+    """Clock for GameRound that only moves when the replay says so."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def validate_run(run: dict, game_logic, max_keys_per_second=MAX_KEYS_PER_SECOND) -> list:
+    """Replays a run record and returns the reasons to reject it (empty = valid)."""
+    if run.get('version') != RUN_FORMAT_VERSION:
+        return [f"unsupported run format version {run.get('version')!r}"]
+    mode = run.get('mode')
+    if mode not in MODE_DURATIONS:
+        return [f"unknown game mode {mode!r}"]
+    keys = run.get('keys')
+    claimed = run.get('score')
+    if not isinstance(keys, str) or not isinstance(claimed, int):
+        return ["missing keys or score"]
+    try:
+        intervals = decode_varints(run.get('intervals', ''))
+    except (ValueError, TypeError) as e:
+        return [f"corrupt interval data ({e})"]
+    if len(intervals) != len(keys):
+        return [f"{len(keys)} keys but {len(intervals)} intervals"]
+    if any(char not in '0123456789.' for char in keys):
+        return ["keys contain characters the game never accepts"]
+    constant = run.get('constant', DEFAULT_CONSTANT)
+    if constant not in CONSTANTS:
+        return [f"unknown constant {constant!r}"]
+    # Enough digits for every key to be correct (cached, or computed in this worker),
+    # capped at what the game offers: a forged run can't make the worker compute more.
+    # Keys past the cap end the round on the last digit and are rejected below.
+    game_logic.constants.ensure(constant, min(len(keys), game_logic.constants.target(constant)))
+    game_logic.set_constant(constant, compute=False)
+
+    reasons = []
+    clock = _ReplayClock()
+    round_ = GameRound(game_logic, mode, clock=clock)
+    round_.start()
+    elapsed_ms = 0
+    burst_times_ms = [] # Every key except auto-repeats
+    close_counts = [0] # close_counts[i]: keys 1..i in burst_times_ms close to the one before
+    repeats_too_fast = 0
+    keys_after_end = 0
+    previous = None
+    for char, interval in zip(keys, intervals):
+        elapsed_ms += interval
+        if previous is not None and char == previous and interval < MAX_REPEAT_INTERVAL_MS:
+            if interval < AUTO_REPEAT_MIN_MS:
+                repeats_too_fast += 1
+        else:
+            if burst_times_ms:
+                close_counts.append(close_counts[-1] + (interval < MIN_KEY_INTERVAL_MS))
+            burst_times_ms.append(elapsed_ms)
+        previous = char
+        clock.now = elapsed_ms / 1000
+        if not round_.active:
+            keys_after_end += 1
+            continue
+        round_.submit(char, elapsed_ms)
+
+    if keys_after_end:
+        reasons.append(f"{keys_after_end} keys after the round ended ({round_.end_reason})")
+    if round_.score != claimed:
+        reasons.append(f"claimed score {claimed} but the replay scores {round_.score}")
+
+    # Input faster than anyone can type: a key repeating faster than a held key
+    # does, keys rolled over again and again, or a sustained burst
+    if repeats_too_fast:
+        reasons.append(f"{repeats_too_fast} repeated keys less than {AUTO_REPEAT_MIN_MS} ms apart")
+    # Runs shorter than a burst are checked as one window
+    windows = range(max(len(burst_times_ms) - BURST_KEYS, 0) + 1)
+    close_bursts = sum(1 for i in windows
+                       if close_counts[min(i + BURST_KEYS, len(close_counts)) - 1] - close_counts[i]
+                       > MAX_CLOSE_PAIRS_PER_BURST)
+    if close_bursts:
+        reasons.append(f"{close_bursts} bursts of {BURST_KEYS} keys with more than "
+                       f"{MAX_CLOSE_PAIRS_PER_BURST} keys less than {MIN_KEY_INTERVAL_MS} ms apart")
+    burst_ms = (BURST_KEYS - 1) * 1000 / max_keys_per_second
+    bursts = sum(1 for first, last in zip(burst_times_ms, burst_times_ms[BURST_KEYS - 1:])
+                 if last - first < burst_ms)
+    if bursts:
+        reasons.append(f"{bursts} bursts of {BURST_KEYS} keys faster than {max_keys_per_second} keys/s")
+    return reasons
+
+# --- Batch validation ---
+
+_worker_game_logic = None
+
+def _init_worker():
+    global _worker_game_logic
+    _worker_game_logic = GameLogic(load_high_scores=False)
+
+def _validate_task(task):
+    label, text, error, max_keys_per_second = task
+    if error is not None:
+        return label, [error]
+    try:
+        run = json.loads(text)
+    except json.JSONDecodeError as e:
+        return label, [f"invalid JSON ({e.msg})"]
+    if not isinstance(run, dict):
+        return label, ["run record is not a JSON object"]
+    return label, validate_run(run, _worker_game_logic, max_keys_per_second)
+
+def iter_run_texts(paths):
+    """Yields (label, json_text, error) for every run found in the given paths.
+
+    A path that is missing or can't be read yields one entry with text None and
+    the reason in error, so it is rejected without stopping the batch.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            walk_errors = []
+            for root, _, files in os.walk(path, onerror=walk_errors.append):
+                for filename in sorted(files):
+                    if filename.endswith(('.json', '.jsonl')):
+                        yield from iter_run_texts([os.path.join(root, filename)])
+            for e in walk_errors:
+                yield e.filename or path, None, f"unreadable directory ({e.strerror or e})"
+            continue
+        try:
+            if path.endswith('.jsonl'):
+                with open(path) as f:
+                    for line_number, line in enumerate(f, 1):
+                        if line.strip():
+                            yield f"{path}:{line_number}", line, None
+            else:
+                with open(path) as f:
+                    yield path, f.read(), None
+        except FileNotFoundError:
+            yield path, None, "no such file or directory"
+        except (OSError, UnicodeDecodeError) as e:
+            yield path, None, f"unreadable file ({getattr(e, 'strerror', None) or e})"
+
+def validate_paths(paths, workers=None, max_keys_per_second=MAX_KEYS_PER_SECOND):
+    """Validates every run under paths across a process pool.
+
+    Returns (checked, rejected) where rejected is a list of (label, reasons).
+    """
+    # Imported here: the game imports this module for save_run() on every launch
+    from concurrent.futures import ProcessPoolExecutor
+    tasks = ((label, text, error, max_keys_per_second) for label, text, error in iter_run_texts(paths))
+    checked = 0
+    rejected = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for label, reasons in pool.map(_validate_task, tasks, chunksize=256):
+            checked += 1
+            if reasons:
+                rejected.append((label, reasons))
+    return checked, rejected
+
+# --- Stored best scores ---
+
+def check_stored_score(profile, mode, score, run_name, game_logic, runs_dir=RUNS_DIR,
+                       max_keys_per_second=MAX_KEYS_PER_SECOND) -> list:
+    """Replays the run that backs one stored best and returns the reasons to reject it."""
+    if not run_name:
+        return ["no run log recorded with the score"]
+    if os.path.basename(run_name) != run_name:
+        return [f"run log name {run_name!r} points outside the runs directory"]
+    try:
+        with open(os.path.join(runs_dir, run_name)) as f:
+            run = json.load(f)
+    except FileNotFoundError:
+        return [f"run log {run_name} is missing"]
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return [f"run log {run_name} is unreadable ({e})"]
+    if not isinstance(run, dict):
+        return [f"run log {run_name} is not a JSON object"]
+    reasons = []
+    if run.get('player') != profile:
+        reasons.append(f"run log {run_name} belongs to {run.get('player')!r}")
+    run_key = score_key(run.get('mode'), run.get('constant', DEFAULT_CONSTANT))
+    if run_key != mode:
+        reasons.append(f"run log {run_name} is a {run_key!r} round")
+    if run.get('score') != score:
+        reasons.append(f"run log {run_name} scores {run.get('score')!r}")
+    return reasons + validate_run(run, game_logic, max_keys_per_second)
+
+def check_stored_scores(store: ScoreStore, profile=None, runs_dir=RUNS_DIR,
+                        max_keys_per_second=MAX_KEYS_PER_SECOND):
+    """Checks every stored best (or one profile's) against its run log.
+
+    Returns (checked, rejected) where rejected is a list of (label, reasons).
+    """
+    game_logic = GameLogic(load_high_scores=False)
+    checked = 0
+    rejected = []
+    for best_profile, mode, score, run_name in store.best_scores():
+        if profile is not None and best_profile != profile:
+            continue
+        checked += 1
+        reasons = check_stored_score(best_profile, mode, score, run_name, game_logic,
+                                     runs_dir, max_keys_per_second)
+        if reasons:
+            rejected.append((f"{best_profile} {mode} {score}", reasons))
+    return checked, rejected
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate πQ run logs by replaying them through the game rules.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    validate = subparsers.add_parser('validate', help="replay run files and report rejected runs")
+    validate.add_argument('paths', nargs='*',
+                          help=f"run files, .jsonl files or directories (default: {RUNS_DIR})")
+    validate.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    validate.add_argument('--max-keys-per-second', type=float, default=MAX_KEYS_PER_SECOND,
+                          help=f"fastest sustained typing accepted (default: {MAX_KEYS_PER_SECOND})")
+    scores = subparsers.add_parser('scores', help="replay the runs behind the stored best scores")
+    scores.add_argument('--profile', default=None, help="only check this player's scores")
+    scores.add_argument('--max-keys-per-second', type=float, default=MAX_KEYS_PER_SECOND,
+                        help=f"fastest sustained typing accepted (default: {MAX_KEYS_PER_SECOND})")
+    args = parser.parse_args()
+
+    if args.command == 'scores':
+        checked, rejected = check_stored_scores(ScoreStore(USER_DATA_DIR), args.profile,
+                                                max_keys_per_second=args.max_keys_per_second)
+        for label, reasons in rejected:
+            print(f"REJECTED {label}: {'; '.join(reasons)}")
+        print(f"Checked {checked} stored scores: {checked - len(rejected)} backed by valid runs, "
+              f"{len(rejected)} rejected.")
+        return 1 if rejected else 0
+
+    paths = args.paths
+    if not paths:
+        # Nothing saved yet is zero runs, not an error
+        paths = [RUNS_DIR] if os.path.isdir(RUNS_DIR) else []
+
+    start = time.perf_counter()
+    checked, rejected = validate_paths(paths, args.workers, args.max_keys_per_second)
+    duration = time.perf_counter() - start
+
+    for label, reasons in rejected:
+        print(f"REJECTED {label}: {'; '.join(reasons)}")
+    rate = checked / duration * 60 if duration > 0 else 0
+    print(f"Checked {checked} runs in {duration:.1f}s ({rate:,.0f} runs/min): "
+          f"{checked - len(rejected)} accepted, {len(rejected)} rejected.")
+    return 1 if rejected else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Opt-in profiling of single rounds, for tracking down stutter.
+
+Run `python main.py --trace` (or set PIQ_TRACE=1) and every round is traced:
+
+- A background thread samples the main thread's Python stack every
+  SAMPLE_INTERVAL seconds and counts identical stacks.
+- The game screen's Clock callbacks and key handlers are timed on every call.
+
+When the round ends, two files are written to USER_DATA_DIR/traces:
+
+- <round>.folded: folded stacks ("outer;inner;leaf count") for flamegraph.pl,
+  speedscope, inferno and similar tools
+- <round>-summary.txt: per-callback call counts and timings, slowest first,
+  plus the slowest individual calls
+
+With tracing off nothing is wrapped or started, so the game runs exactly the
+code it runs without this module.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from array import array
+
+from game_logic import USER_DATA_DIR
+from utils import env_flag
+
+TRACE_ENABLED = env_flag('PIQ_TRACE')
+TRACES_DIR = os.path.join(USER_DATA_DIR, 'traces')
+
+SAMPLE_INTERVAL = 0.001 # Seconds between stack samples
+SLOWEST_CALLS_LISTED = 20
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Counts folded stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {} # Folded stack -> sample count
+        self.samples = 0
+        self._labels = {} # code object -> frame label, so each is formatted once
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='piq-trace-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                labels.append(label)
+                frame = frame.f_back
+            del frame
+            folded = ';'.join(reversed(labels)) # Outermost frame first
+            self.stacks[folded] = self.stacks.get(folded, 0) + 1
+            self.samples += 1
+
+class RoundProfiler:
+    """Collects stack samples and callback timings for one round at a time."""
+
+    def __init__(self):
+        self.active = False
+        self.sampler = None
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.calls = {} # Callback name -> (start offsets, durations) in seconds
+
+    def start(self):
+        """Starts tracing a new round, discarding anything left from the last one."""
+        if self.active:
+            self.stop()
+        self.calls = {}
+        self.sampler = StackSampler(threading.main_thread().ident)
+        self.started_at = time.perf_counter()
+        self.active = True
+        self.sampler.start()
+
+    def stop(self):
+        """Stops tracing without writing anything (e.g. the round was abandoned)."""
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.active:
+            self.duration = time.perf_counter() - self.started_at
+        self.active = False
+
+    def record(self, name, started, duration):
+        if not self.active:
+            return
+        timings = self.calls.get(name)
+        if timings is None:
+            timings = self.calls[name] = (array('d'), array('d'))
+        timings[0].append(started - self.started_at)
+        timings[1].append(duration)
+
+    def finish(self, label: str, directory=TRACES_DIR):
+        """Stops tracing and writes the folded stacks and the summary.
+
+        Returns the path of the summary, or None if writing failed.
+        """
+        if not self.active:
+            return None
+        self.stop()
+        # Nanoseconds keep rounds that end in the same second apart, as in replay.save_run
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{label}")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{base}.folded", 'w') as f:
+                for stack, count in sorted(self.sampler.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            with open(f"{base}-summary.txt", 'w') as f:
+                f.write(self.summary())
+        except OSError as e:
+            print(f"Error writing round trace to {directory}: {e}")
+            return None
+        print(f"Round trace written to {base}.folded and {base}-summary.txt")
+        return f"{base}-summary.txt"
+
+    def summary(self) -> str:
+        """Per-callback timings, slowest worst case first, then the slowest calls."""
+        lines = []
+        samples = self.sampler.samples if self.sampler else 0
+        lines.append(f"Round traced for {self.duration:.1f}s, {samples} stack samples "
+                     f"(every {SAMPLE_INTERVAL * 1000:g} ms requested)")
+        lines.append("")
+        lines.append(f"{'callback':<30} {'calls':>7} {'total ms':>10} {'mean ms':>9} "
+                     f"{'p95 ms':>8} {'max ms':>8}")
+        rows = []
+        for name, (_, durations) in self.calls.items():
+            ordered = sorted(durations)
+            p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+            rows.append((ordered[-1], name, len(ordered), sum(ordered), p95))
+        for worst, name, count, total, p95 in sorted(rows, reverse=True):
+            lines.append(f"{name:<30} {count:>7} {total * 1000:>10.2f} {total / count * 1000:>9.3f} "
+                         f"{p95 * 1000:>8.3f} {worst * 1000:>8.3f}")
+        lines.append("")
+        lines.append(f"Slowest {SLOWEST_CALLS_LISTED} calls (seconds into the round):")
+        slowest = sorted(((duration, offset, name)
+                          for name, (offsets, durations) in self.calls.items()
+                          for offset, duration in zip(offsets, durations)), reverse=True)
+        for duration, offset, name in slowest[:SLOWEST_CALLS_LISTED]:
+            lines.append(f"  {offset:8.3f}s  {duration * 1000:8.3f} ms  {name}")
+        return '\n'.join(lines) + '\n'
+
+profiler = RoundProfiler()
+
+def _timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(name, started, time.perf_counter() - started)
+    return wrapper
+
+def instrument(cls, method_names):
+    """Wraps the named methods of cls with timers, only when tracing is on."""
+    if not TRACE_ENABLED:
+        return
+    for method_name in method_names:
+        setattr(cls, method_name, _timed(method_name, getattr(cls, method_name)))
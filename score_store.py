@@ -0,0 +1,180 @@
+"""
+Multi-profile high score store that several πQ instances can share.
+
+Scores live in an append-only log (scores.log, one JSON record per line) in the
+user data directory. Writers take an exclusive lock on scores.lock, catch up
+with the log, and append a record only if it beats the stored best. Readers keep
+an in-memory index of every profile's best scores and refresh it with a single
+stat() call, reading only the bytes appended since the last refresh. When the
+log grows large it is compacted to one line per profile and mode.
+
+Each record names the run file (see replay.py) whose keystroke log backs the
+score, so `replay.py scores` can replay every stored best.
+"""
+
+import json
+import os
+import time
+
+from utils import atomic_write
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# Rewrite the log once it grows past this size
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+
+class FileLock:
+    """Exclusive inter-process lock held on a separate lock file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError: # LK_LOCK gives up after ~10s; keep waiting
+                    continue
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+class ScoreStore:
+    """Best score per (profile, mode), backed by a shared append-only log."""
+
+    def __init__(self, directory):
+        self.log_path = os.path.join(directory, 'scores.log')
+        self.lock = FileLock(os.path.join(directory, 'scores.lock'))
+        self._index = {} # profile -> {mode: best score}
+        self._runs = {} # (profile, mode) -> run file name backing the best score
+        self._offset = 0 # Bytes of the log already applied to the index
+        self._file_id = None # (device, inode) of the log we have read
+
+    def refresh(self):
+        """Applies records other instances appended since the last refresh."""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            self._index.clear()
+            self._runs.clear()
+            self._offset = 0
+            self._file_id = None
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            # Compacted or replaced since we last looked: start over
+            self._index.clear()
+            self._runs.clear()
+            self._offset = 0
+            self._file_id = file_id
+        if stat.st_size == self._offset:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Only apply complete lines; a partial line is picked up next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            self._apply(line)
+        self._offset += end
+
+    def _apply(self, line: bytes):
+        try:
+            record = json.loads(line)
+            profile, mode, score = record['p'], record['m'], int(record['s'])
+            run = record.get('r')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return # Skip damaged lines rather than losing the whole store
+        scores = self._index.setdefault(profile, {})
+        if score > scores.get(mode, 0):
+            scores[mode] = score
+            if run:
+                self._runs[(profile, mode)] = run
+            else:
+                self._runs.pop((profile, mode), None)
+
+    def get_high_score(self, profile: str, mode: str) -> int:
+        self.refresh()
+        return self._index.get(profile, {}).get(mode, 0)
+
+    def best_scores(self) -> list:
+        """(profile, mode, score, run file name or None) for every stored best."""
+        self.refresh()
+        return [(profile, mode, score, self._runs.get((profile, mode)))
+                for profile, scores in sorted(self._index.items())
+                for mode, score in sorted(scores.items())]
+
+    def record_score(self, profile: str, mode: str, score: int, run=None) -> bool:
+        """Stores score if it beats the profile's best; returns True if written.
+
+        run is the file name of the round's run log, if it was saved.
+        """
+        with self.lock:
+            self.refresh() # Merge whatever other instances wrote first
+            if score <= self._index.get(profile, {}).get(mode, 0):
+                return False
+            self._append([self._record(profile, mode, score, int(time.time()), run)])
+            if self._offset > COMPACT_THRESHOLD_BYTES:
+                try:
+                    self._compact()
+                except OSError as e: # e.g. a reader has the log open on Windows
+                    print(f"Error compacting {self.log_path}: {e}")
+        return True
+
+    def import_scores(self, profile: str, scores: dict) -> bool:
+        """Seeds an empty store (e.g. from the old high_scores.json); no-op otherwise."""
+        with self.lock:
+            self.refresh()
+            if self._file_id is not None:
+                return False
+            now = int(time.time())
+            self._append([{'p': profile, 'm': mode, 's': int(score), 't': now}
+                          for mode, score in scores.items()])
+        return True
+
+    @staticmethod
+    def _record(profile, mode, score, timestamp, run=None) -> dict:
+        record = {'p': profile, 'm': mode, 's': score, 't': timestamp}
+        if run:
+            record['r'] = run
+        return record
+
+    def _append(self, records):
+        """Appends records while holding the lock and folds them into the index."""
+        data = b''.join(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                        for record in records)
+        with open(self.log_path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.refresh()
+
+    def _compact(self):
+        """Rewrites the log as one record per profile and mode (lock held)."""
+        now = int(time.time())
+        with atomic_write(self.log_path, 'wb', fsync=True) as f:
+            for profile, scores in self._index.items():
+                for mode, score in scores.items():
+                    record = self._record(profile, mode, score, now, self._runs.get((profile, mode)))
+                    f.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+        self.refresh()
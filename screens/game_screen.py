@@ -14,6 +14,14 @@ import math
 
 # Import animations
 from animations import shake_animation, particle_effect
+import audio
+from frame_pacing import frame_pacer, PAUSED
+from game_logic import GameRound, format_remaining
+from memory_stats import memory_monitor
+from numeric_keypad import KEYPAD_ENABLED
+from replay import save_run
+import metrics
+import round_profiler
 
 class DigitLabel(Label):
     """ Custom Label for displaying digits with background color. """
@@ -65,6 +73,7 @@ class GameScreen(Screen):
     line_digit_count = 0
     MAX_LINES_DISPLAYED = 5
     DIGITS_PER_LINE = 10
+    TIMER_INTERVAL = 0.1 # Seconds between timer label refreshes
 
     # --- Background Animation Constants ---
     MAX_BG_CIRCLES = 15
@@ -92,7 +101,9 @@ class GameScreen(Screen):
         self.add_widget(self.particle_layout)
 
         self.background_circles = [] # List to store circle data dictionaries
+        self.round = None
         self._game_setup_scheduled = False
+        frame_pacer.bind(state=self._on_render_state)
 
     def on_enter(self, *args):
         """Schedules the game setup shortly after entering the screen."""
@@ -128,11 +139,14 @@ class GameScreen(Screen):
         # Initialize background circles
         for _ in range(self.MAX_BG_CIRCLES):
             self.background_circles.append(self._create_background_circle(initial=True))
+        self._draw_background_circles()
         
-        # Schedule background animation update
-        Clock.schedule_interval(self.update_background_animation, 1.0 / 60.0)
+        # Background animation runs at the frame pacing rate (full speed while typing)
+        frame_pacer.enter_round()
+        self._schedule_background(frame_pacer.state)
 
-        # Reset game state
+        # Reset game state (the rules live in GameRound; these mirror it for the UI)
+        self.round = GameRound(self.game_logic, self.game_mode)
         self.score = 0
         self.combo = 0
         self.mistakes = 0
@@ -148,28 +162,34 @@ class GameScreen(Screen):
         # Set up timer and labels based on mode
         # Cancel previous timer just in case on_leave wasn't called properly
         Clock.unschedule(self.update_timer)
-        if self.game_mode == 'Blitz':
-            self.time_remaining = 30
+        # The deadline is fixed here; the Clock only refreshes the display
+        self.round.start()
+        if self.game_mode in ('Blitz', 'Standard'):
+            self.time_remaining = self.round.timer.remaining()
             self.ids.mistakes_label.opacity = 0
-            Clock.schedule_interval(self.update_timer, 1)
-        elif self.game_mode == 'Standard':
-            self.time_remaining = 180 # 3 minutes
-            self.ids.mistakes_label.opacity = 0
-            Clock.schedule_interval(self.update_timer, 1)
+            Clock.schedule_interval(self.update_timer, self.TIMER_INTERVAL)
         elif self.game_mode == 'Unlimited':
             self.time_remaining = 0 # Not used, but set
             self.ids.timer_label.text = 'Time: ∞'
             self.ids.mistakes_label.opacity = 1
-            self.ids.mistakes_label.text = f'Mistakes: {self.mistakes}/3'
+            self.ids.mistakes_label.text = f'Mistakes: {self.mistakes}/{self.round.max_mistakes}'
 
         self.update_ui_labels() # Safe to call now
         self._game_setup_scheduled = False # Reset flag for next entry
+        if round_profiler.TRACE_ENABLED:
+            round_profiler.profiler.start()
 
     def _request_keyboard(self):
         """Requests the keyboard for input handling."""
         # Check if keyboard is already requested
         if self._keyboard:
             return
+        if KEYPAD_ENABLED:
+            # Requesting the keyboard would pop up the OS soft keyboard over the
+            # digits; hardware keys still arrive through the window
+            self._keyboard = Window
+            Window.bind(on_key_down=self._on_window_key_down)
+            return
         self._keyboard = Window.request_keyboard(
             self._keyboard_closed, self, 'text'
         )
@@ -185,14 +205,33 @@ class GameScreen(Screen):
     def _keyboard_closed(self):
         """Handles keyboard closing."""
         print("Keyboard closed")
-        if self._keyboard:
+        if self._keyboard is Window:
+             Window.unbind(on_key_down=self._on_window_key_down)
+             self._keyboard = None
+        elif self._keyboard:
              self._keyboard.unbind(on_key_down=self._on_key_down)
              self._keyboard = None
+        if self.ids and 'keypad' in self.ids:
+            self.ids.keypad.release_all()
+
+    def _on_window_key_down(self, window, key, scancode, codepoint, modifiers):
+        """Hardware keys while the on-screen keypad stands in for the keyboard."""
+        return self._on_key_down(None, (key, codepoint or ''), codepoint, modifiers)
+
+    def handle_keypad_input(self, char: str):
+        """Handles a key pressed on the on-screen keypad."""
+        if not self.game_active:
+            return
+        if metrics.METRICS_ENABLED:
+            metrics.record_keystroke()
+        self.handle_input(char)
 
     def _on_key_down(self, keyboard, keycode, text, modifiers):
         """Handles key press events, including numpad and decimal points."""
         if not self.game_active:
             return False # Don't process input if game isn't active
+        if metrics.METRICS_ENABLED:
+            metrics.record_keystroke()
 
         numeric_keycode, key_str = keycode
         char_to_handle = None
@@ -214,22 +253,7 @@ class GameScreen(Screen):
              char_to_handle = '.'
 
         # Only proceed if the input is relevant (digit or decimal)
-        # and if the expected character is actually a decimal when a decimal is pressed
         if char_to_handle is not None:
-            # Special check: only allow decimal input if it's expected
-            expected_char = self.game_logic.get_pi_digit(self.current_digit_index)
-            if char_to_handle == '.' and expected_char != '.':
-                 print("Decimal point entered, but not expected.")
-                 # Trigger error feedback maybe? For now, just ignore.
-                 shake_animation(self.ids.digits_display, intensity=5, duration=0.15, type='error')
-                 return True # Consume the event but do nothing else
-            elif char_to_handle != '.' and expected_char == '.':
-                 print(f"Digit {char_to_handle} entered, but decimal point expected.")
-                 # Trigger error feedback
-                 shake_animation(self.ids.digits_display, intensity=5, duration=0.15, type='error')
-                 return True # Consume the event but do nothing else
-            
-            # If it's a digit, or it's a decimal and a decimal is expected, handle it
             self.handle_input(char_to_handle)
             return True # Consume the event
 
@@ -322,19 +346,22 @@ class GameScreen(Screen):
         """Processes the user's digit input. Incorrect digits give feedback but don't display."""
         if not self.game_active:
             return
+        frame_pacer.note_input()
+
+        # Get the correct character (digit or '.') before the round moves on
+        correct_char = self.round.expected_char()
+        result = self.round.submit(entered_digit)
+
+        if result == GameRound.IGNORED:
+            if not self.round.active:
+                # The deadline passed before the Clock noticed; the key doesn't count
+                self.end_game(self.round.end_reason)
+                return
+            # A decimal point where a digit belongs (or vice versa): nudge, nothing else
+            print(f"Ignored {entered_digit!r}, expected {correct_char!r}.")
+            shake_animation(self.ids.digits_display, intensity=5, duration=0.15, type='error')
+            return
 
-        # Special case for the decimal point after '3'
-        if self.current_digit_index == 1: # After entering '3'
-             correct_char = '.'
-             # Allow player to just type the next digit '1' and skip decimal? No, requirement is 3.14...
-             # For now, let's assume the logic should handle the decimal correctly via get_pi_digit
-             # We just need to ensure '.' isn't checked with isdigit later
-             pass # Let existing logic handle it
-
-        # Get the correct character (digit or '.')
-        # Need to adjust game_logic.py to NOT strip the decimal
-        correct_char = self.game_logic.get_pi_digit(self.current_digit_index)
-        
         last_digit_pos = self.center # Default position
         current_cursor_widget = None
 
@@ -349,13 +376,18 @@ class GameScreen(Screen):
             elif isinstance(last_widget, DigitLabel):
                  last_digit_pos = last_widget.center
 
-        if entered_digit == correct_char:
+        self.score = self.round.score
+        self.combo = self.round.combo
+        self.mistakes = self.round.mistakes
+        self.current_digit_index = self.round.index
+
+        if result == GameRound.CORRECT:
             # Remove the placeholder cursor BEFORE adding the correct digit
             self.remove_cursor()
 
-            self.score += 1
-            self.combo += 1
-            self.current_digit_index += 1
+            audio.audio_feedback.play_correct(self.combo)
+            if metrics.METRICS_ENABLED:
+                metrics.inputs.inc('correct')
             self.add_digit_to_display(entered_digit, self.CORRECT_COLOR)
             
             # --- Shake the digits display layout --- 
@@ -369,8 +401,10 @@ class GameScreen(Screen):
             # Add the cursor back for the next digit
             self.add_cursor()
         else:
-            # Incorrect digit: Reset combo, trigger feedback, DO NOT display digit
-            self.combo = 0
+            # Incorrect digit: trigger feedback, DO NOT display digit
+            audio.audio_feedback.play_error()
+            if metrics.METRICS_ENABLED:
+                metrics.inputs.inc('incorrect')
             
             # --- Shake the digits display layout --- 
             shake_animation(self.ids.digits_display, intensity=8, duration=0.2, type='error') # Target layout inside ScrollView
@@ -380,11 +414,9 @@ class GameScreen(Screen):
             particle_effect(last_digit_pos, self.particle_layout, type='error')
             print(f"Incorrect! Expected: {correct_char}") # Debug
 
-            if self.game_mode == 'Unlimited':
-                self.mistakes += 1
-                if self.mistakes >= 3:
-                    self.end_game("Too many mistakes!")
-                    return # Stop further processing
+            if not self.round.active: # Mistake limit reached
+                self.end_game(self.round.end_reason)
+                return # Stop further processing
             # Do NOT add the incorrect digit to the display
             # Cursor remains in the same place (or is re-added if it was somehow removed)
             if not current_cursor_widget or current_cursor_widget.parent is None:
@@ -394,19 +426,19 @@ class GameScreen(Screen):
         # Update UI labels regardless of correct/incorrect
         self.update_ui_labels()
 
-        # Check if Pi sequence is exhausted (only after correct entry)
-        if entered_digit == correct_char and self.current_digit_index >= self.game_logic.get_pi_sequence_length():
-             self.end_game("Congratulations! You memorized all loaded digits!")
+        # The round also ends once the loaded digits are exhausted
+        if not self.round.active:
+             self.end_game(self.round.end_reason)
 
     def update_timer(self, dt):
-        """Updates the game timer each second."""
+        """Refreshes the remaining time from the round deadline."""
         if not self.game_active:
             return
 
-        self.time_remaining -= 1
+        self.time_remaining = self.round.timer.remaining()
         self.update_ui_labels()
 
-        if self.time_remaining <= 0:
+        if self.round.timer.expired():
             self.end_game("Time's up!")
 
     def update_ui_labels(self):
@@ -415,11 +447,9 @@ class GameScreen(Screen):
             self.ids.score_label.text = f"Score: {self.score}"
             self.ids.combo_label.text = f"Combo: {self.combo}"
             if self.game_mode != 'Unlimited':
-                 minutes = int(self.time_remaining) // 60
-                 seconds = int(self.time_remaining) % 60
-                 self.ids.timer_label.text = f"Time: {minutes:02d}:{seconds:02d}"
+                 self.ids.timer_label.text = f"Time: {format_remaining(self.time_remaining)}"
             if self.game_mode == 'Unlimited':
-                self.ids.mistakes_label.text = f"Mistakes: {self.mistakes}/3"
+                self.ids.mistakes_label.text = f"Mistakes: {self.mistakes}/{self.round.max_mistakes}"
         else:
             print("Warning: GameScreen ids not found during UI update.")
 
@@ -432,10 +462,25 @@ class GameScreen(Screen):
         self.game_active = False
         self._keyboard_closed() # Release keyboard
         Clock.unschedule(self.update_timer)
+        Clock.unschedule(self.update_background_animation)
+        frame_pacer.leave_round()
+        self.round.finish(message)
+        timer = self.round.timer
+        keystrokes_per_second = timer.keystrokes_per_second() # Also saved in the run log below
+        print(f"Round lasted {timer.elapsed():.1f}s, "
+              f"{keystrokes_per_second:.2f} keystrokes/s")
+        if metrics.METRICS_ENABLED:
+            metrics.rounds.inc(self.game_mode)
+            metrics.round_duration.observe(timer.elapsed())
+            metrics.round_keystroke_rate.observe(keystrokes_per_second)
+        if round_profiler.TRACE_ENABLED:
+            round_profiler.profiler.finish(self.game_mode)
 
         # Update high score
         app = App.get_running_app()
-        app.game_logic.update_high_score(self.game_mode, self.score)
+        # Keystroke log that backs the score (see replay.py), saved first so the score can name it
+        run_path = save_run(self.round, profile=app.game_logic.profile)
+        app.game_logic.update_high_score(self.game_mode, self.score, run_path)
 
         # TODO: Show a game over popup/screen instead of just returning
         # For now, just transition back to landing screen
@@ -449,8 +494,11 @@ class GameScreen(Screen):
         Clock.unschedule(self.setup_game)
         # Unschedule background animation
         Clock.unschedule(self.update_background_animation)
+        frame_pacer.leave_round()
         self._game_setup_scheduled = False # Reset flag
         self._keyboard_closed()
+        if round_profiler.TRACE_ENABLED:
+            round_profiler.profiler.stop() # Left mid-round; nothing worth writing
         Clock.unschedule(self.update_timer)
         # Clear widgets safely, checking if ids exist
         if hasattr(self, 'ids') and self.ids and self.ids.digits_display:
@@ -461,6 +509,8 @@ class GameScreen(Screen):
         if hasattr(self, 'background_animation_layer'):
              self.background_animation_layer.canvas.clear()
         self.background_circles.clear()
+        # Every screen: the manager has already detached this one from the window
+        memory_monitor.report_round(self.manager.screens)
 
     def _create_background_circle(self, initial=False):
         """ Creates a dictionary representing a background circle. """
@@ -491,60 +541,75 @@ class GameScreen(Screen):
 
         return {'pos': pos, 'size': size, 'color': color, 'velocity': velocity}
 
-    def update_background_animation(self, dt):
-        """ Updates and redraws the background circles with softer edges. """
-        self.background_animation_layer.canvas.clear()
-        w, h = Window.size
+    def _draw_background_circles(self):
+        """ Creates the canvas instructions for each background circle once per round.
+
+        Every circle gets a larger, very faint outer ellipse plus the main inner
+        ellipse for a softer edge. The frame update only moves these instructions,
+        so the canvas isn't rebuilt (and its instructions reallocated) at 60 Hz.
+        """
+        outer_size_factor = 1.2 # How much larger the outer faint part is
+        outer_alpha_factor = 0.4 # How much fainter the outer part is
 
         with self.background_animation_layer.canvas:
             for circle in self.background_circles:
-                # Update position
-                circle['pos'][0] += circle['velocity'][0] * dt
-                circle['pos'][1] += circle['velocity'][1] * dt
-                
-                # Check boundaries and reset if needed
                 size = circle['size']
-                reset = False
-                if circle['velocity'][0] > 0 and circle['pos'][0] > w:
-                    circle['pos'][0] = -size # Reset to left
-                    circle['pos'][1] = random.uniform(0, h)
-                    reset = True
-                elif circle['velocity'][0] < 0 and circle['pos'][0] < -size:
-                    circle['pos'][0] = w # Reset to right
-                    circle['pos'][1] = random.uniform(0, h)
-                    reset = True
-                    
-                if circle['velocity'][1] > 0 and circle['pos'][1] > h:
-                    circle['pos'][1] = -size # Reset to bottom
-                    circle['pos'][0] = random.uniform(0, w)
-                    reset = True
-                elif circle['velocity'][1] < 0 and circle['pos'][1] < -size:
-                    circle['pos'][1] = h # Reset to top
-                    circle['pos'][0] = random.uniform(0, w)
-                    reset = True
-                    
-                # Optional: Randomize velocity slightly on reset
-                # if reset:
-                #    speed = random.uniform(self.BG_CIRCLE_MIN_SPEED, self.BG_CIRCLE_MAX_SPEED)
-                #    angle = random.uniform(0, 360)
-                #    circle['velocity'] = [speed * math.cos(math.radians(angle)), speed * math.sin(math.radians(angle))] 
-
-                # Draw softer circle
-                pos = circle['pos']
                 base_color_rgba = circle['color']
-
-                # 1. Draw a larger, very faint outer ellipse
-                outer_size_factor = 1.2 # How much larger the outer faint part is
-                outer_alpha_factor = 0.4 # How much fainter the outer part is
                 outer_size = size * outer_size_factor
-                # Calculate position offset to keep it centered
-                outer_pos_offset = (outer_size - size) / 2.0 
-                outer_pos = (pos[0] - outer_pos_offset, pos[1] - outer_pos_offset)
+                # Position offset that keeps the outer ellipse centered
+                circle['outer_offset'] = (outer_size - size) / 2.0
                 outer_color = base_color_rgba[:3] + [base_color_rgba[3] * outer_alpha_factor]
-                
-                Color(rgba=outer_color)
-                Ellipse(pos=outer_pos, size=(outer_size, outer_size))
 
-                # 2. Draw the main, slightly smaller inner ellipse (original logic)
+                Color(rgba=outer_color)
+                circle['outer_ellipse'] = Ellipse(size=(outer_size, outer_size))
                 Color(rgba=base_color_rgba)
-                Ellipse(pos=pos, size=(size, size))
\ No newline at end of file
+                circle['inner_ellipse'] = Ellipse(size=(size, size))
+                self._move_background_circle(circle)
+
+    def _move_background_circle(self, circle):
+        """ Moves a circle's canvas instructions to its current position. """
+        pos = circle['pos']
+        offset = circle['outer_offset']
+        circle['outer_ellipse'].pos = (pos[0] - offset, pos[1] - offset)
+        circle['inner_ellipse'].pos = (pos[0], pos[1])
+
+    def _schedule_background(self, state):
+        """ Runs the background animation at the rate for the frame pacing state. """
+        Clock.unschedule(self.update_background_animation)
+        if state != PAUSED: # Nothing to see while unfocused or minimized
+            Clock.schedule_interval(self.update_background_animation, 1.0 / frame_pacer.fps_for(state))
+
+    def _on_render_state(self, pacer, state):
+        if self.game_active:
+            self._schedule_background(state)
+
+    def update_background_animation(self, dt):
+        """ Updates the positions of the background circles. """
+        w, h = Window.size
+
+        for circle in self.background_circles:
+            # Update position
+            circle['pos'][0] += circle['velocity'][0] * dt
+            circle['pos'][1] += circle['velocity'][1] * dt
+
+            # Check boundaries and reset if needed
+            size = circle['size']
+            if circle['velocity'][0] > 0 and circle['pos'][0] > w:
+                circle['pos'][0] = -size # Reset to left
+                circle['pos'][1] = random.uniform(0, h)
+            elif circle['velocity'][0] < 0 and circle['pos'][0] < -size:
+                circle['pos'][0] = w # Reset to right
+                circle['pos'][1] = random.uniform(0, h)
+
+            if circle['velocity'][1] > 0 and circle['pos'][1] > h:
+                circle['pos'][1] = -size # Reset to bottom
+                circle['pos'][0] = random.uniform(0, w)
+            elif circle['velocity'][1] < 0 and circle['pos'][1] < -size:
+                circle['pos'][1] = h # Reset to top
+                circle['pos'][0] = random.uniform(0, w)
+
+            self._move_background_circle(circle)
+
+# Time the Clock callbacks and key handlers when tracing (no-op otherwise)
+round_profiler.instrument(GameScreen, ['update_background_animation', 'update_timer', '_adjust_scroll',
+                                       '_on_key_down', 'handle_keypad_input'])
@@ -1,12 +1,37 @@
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
 from kivy.properties import ObjectProperty
 
+from constants import CONSTANTS, DEFAULT_CONSTANT, decimal_count
+
+# NumPy is optional; without it the screens simply show no trivia
+try:
+    from digit_analytics import DigitAnalytics, get_analytics
+except ImportError:
+    get_analytics = None
+
+def random_trivia() -> str:
+    """A random statistic about the selected constant's digits, or '' if unavailable."""
+    if get_analytics is None:
+        return ""
+    game_logic = App.get_running_app().game_logic
+    try:
+        if game_logic.constant == DEFAULT_CONSTANT:
+            return get_analytics().random_trivia()
+        # Computed constants are already in memory (and still growing), so no caching
+        return DigitAnalytics.from_string(game_logic.digits).random_trivia(
+            name=CONSTANTS[game_logic.constant].symbol)
+    except (OSError, ValueError) as e:
+        print(f"Error computing digit trivia: {e}")
+        return ""
+
 class LandingScreen(Screen):
     """The main landing screen of the πQ application."""
     blitz_high_score_label = ObjectProperty(None)
     standard_high_score_label = ObjectProperty(None)
     unlimited_high_score_label = ObjectProperty(None)
+    _listening = False
 
     def on_enter(self, *args):
         """Called when the screen is entered. Updates high score display."""
@@ -14,15 +39,70 @@ class LandingScreen(Screen):
         # Update labels using the ids defined in piq.kv (requires kv to be loaded)
         # Safely access ids after kv loading
         if self.ids:
-            self.ids.blitz_high_score.text = f"Blitz High Score: {app.game_logic.get_high_score('Blitz')}"
-            self.ids.standard_high_score.text = f"Standard High Score: {app.game_logic.get_high_score('Standard')}"
-            self.ids.unlimited_high_score.text = f"Unlimited High Score: {app.game_logic.get_high_score('Unlimited')}"
+            self.ids.player_input.text = app.game_logic.profile
+            self.ids.constant_spinner.values = [constant.label for constant in CONSTANTS.values()]
+            self.ids.constant_spinner.text = CONSTANTS[app.game_logic.constant].label
+            if not self._listening:
+                # Told by the constant library when digits arrive; no polling
+                app.game_logic.constants.add_listener(self._on_digits_computed)
+                self._listening = True
+            self.update_constant_status()
+            self.update_high_scores()
+            self.ids.trivia_label.text = random_trivia()
         else:
             print("Warning: LandingScreen ids not found, check piq.kv loading.")
 
+    def update_high_scores(self):
+        """Shows the current player's best score in each mode."""
+        game_logic = App.get_running_app().game_logic
+        self.ids.blitz_high_score.text = f"Blitz High Score: {game_logic.get_high_score('Blitz')}"
+        self.ids.standard_high_score.text = f"Standard High Score: {game_logic.get_high_score('Standard')}"
+        self.ids.unlimited_high_score.text = f"Unlimited High Score: {game_logic.get_high_score('Unlimited')}"
+
+    def set_constant(self, label: str):
+        """Switches the constant picked in the spinner and starts computing its digits."""
+        key = next((key for key, constant in CONSTANTS.items() if constant.label == label), None)
+        game_logic = App.get_running_app().game_logic
+        if key is None or key == game_logic.constant:
+            return
+        game_logic.set_constant(key)
+        self.update_constant_status()
+        self.update_high_scores()
+        self.ids.trivia_label.text = random_trivia()
+
+    def update_constant_status(self):
+        """Shows how many digits of the selected constant are ready."""
+        game_logic = App.get_running_app().game_logic
+        key = game_logic.constant
+        available = decimal_count(game_logic.digits)
+        if game_logic.constants.is_computing(key):
+            status = f"{available:,} of {game_logic.constants.target(key):,} digits…"
+        else:
+            status = f"{available:,} digits"
+        self.ids.constant_status.text = status
+
+    def _on_digits_computed(self, key):
+        # Runs on the constant library's thread; update the labels on the Kivy thread
+        Clock.schedule_once(lambda dt: self._refresh_constant(key))
+
+    def _refresh_constant(self, key):
+        if key == App.get_running_app().game_logic.constant:
+            self.update_constant_status()
+            if not self.ids.trivia_label.text: # Picked before any digits had arrived
+                self.ids.trivia_label.text = random_trivia()
+
+    def set_player(self, name: str):
+        """Switches to another player's profile and shows their scores."""
+        game_logic = App.get_running_app().game_logic
+        game_logic.set_profile(name)
+        self.ids.player_input.text = game_logic.profile # Show the cleaned-up name
+        self.update_high_scores()
+
     def start_game(self, mode: str):
         """Transitions to the countdown screen with the selected mode."""
         app = App.get_running_app()
+        if app.game_logic.get_pi_sequence_length() == 0:
+            return # The first digits of a computed constant haven't arrived yet
         # Store the selected mode in the app or pass it to the next screen
         app.selected_game_mode = mode 
         self.manager.current = 'countdown' 
\ No newline at end of file
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Terminal (curses) front end for πQ.
+
+Plays the same Blitz/Standard/Unlimited rounds as the Kivy app, using GameLogic
+for the digits and high scores and GameRound for the rules. Kivy is never
+imported, so this starts instantly and works over SSH or without OpenGL.
+
+Usage:
+    python terminal_ui.py
+    python main.py --terminal
+"""
+
+import locale
+import sys
+
+try:
+    import curses
+except ImportError: # Windows needs the windows-curses package
+    curses = None
+
+from constants import CONSTANTS, decimal_count
+from game_logic import GameLogic, GameRound, MAX_PROFILE_NAME_LENGTH, format_remaining
+from replay import save_run
+
+MODES = ['Blitz', 'Standard', 'Unlimited']
+MODE_LABELS = {'Blitz': 'Blitz (30s)', 'Standard': 'Standard (3m)', 'Unlimited': 'Unlimited'}
+DIGITS_PER_LINE = 10
+MAX_LINES_DISPLAYED = 5
+REFRESH_MS = 100 # Input poll timeout, i.e. how often the timer is redrawn
+MENU_REFRESH_MS = 250 # Menu redraw interval while a constant's digits are being computed
+ESCAPE_KEY = 27
+
+# Color pair ids
+CORRECT = 1
+DIM = 2
+CURSOR = 3
+ERROR = 4
+
+class TerminalGame:
+    """Menu, countdown and round loop drawn with curses."""
+
+    def __init__(self, stdscr, game_logic: GameLogic):
+        self.stdscr = stdscr
+        self.game_logic = game_logic
+        self.colors = {}
+        curses.curs_set(0)
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(CORRECT, curses.COLOR_GREEN, -1)
+            curses.init_pair(DIM, curses.COLOR_WHITE, -1)
+            curses.init_pair(CURSOR, curses.COLOR_CYAN, -1)
+            curses.init_pair(ERROR, curses.COLOR_RED, -1)
+            self.colors = {pair: curses.color_pair(pair) for pair in (CORRECT, DIM, CURSOR, ERROR)}
+
+    def color(self, pair) -> int:
+        return self.colors.get(pair, curses.A_NORMAL)
+
+    def put(self, row, col, text, attr=0):
+        """Draws text, silently clipping anything outside the window."""
+        height, width = self.stdscr.getmaxyx()
+        if 0 <= row < height and col < width:
+            try:
+                self.stdscr.addstr(row, col, text[:max(width - col - 1, 0)], attr)
+            except curses.error:
+                pass
+
+    def run(self):
+        """Shows the menu until the player quits."""
+        while True:
+            mode = self.menu()
+            if mode is None:
+                return
+            if self.countdown():
+                self.play(mode)
+
+    def menu(self) -> str | None:
+        while True:
+            computing = self.game_logic.constants.is_computing(self.game_logic.constant)
+            # Poll while digits are being computed so the "ready" count keeps up
+            self.stdscr.timeout(MENU_REFRESH_MS if computing else -1)
+            self.draw_menu()
+            key = self.stdscr.getch()
+            if key in (ord('q'), ord('Q'), ESCAPE_KEY):
+                return None
+            if key in (ord('p'), ord('P')):
+                self.change_player()
+            elif key in (ord('c'), ord('C')):
+                keys = list(CONSTANTS)
+                self.game_logic.set_constant(keys[(keys.index(self.game_logic.constant) + 1) % len(keys)])
+            elif ord('1') <= key < ord('1') + len(MODES) and self.game_logic.digits:
+                return MODES[key - ord('1')] # Ignored until the first digits are computed
+
+    def draw_menu(self):
+        self.stdscr.erase()
+        self.put(1, 2, "πQ - Pi Memory Game", curses.A_BOLD | self.color(CURSOR))
+        constant = CONSTANTS[self.game_logic.constant]
+        self.put(2, 2, f"Player: {self.game_logic.profile}   "
+                       f"Digits: {constant.symbol} ({decimal_count(self.game_logic.digits):,} ready)")
+        for row, mode in enumerate(MODES):
+            self.put(4 + row, 2, f"{mode} High Score: {self.game_logic.get_high_score(mode)}")
+        for row, mode in enumerate(MODES):
+            self.put(8 + row, 2, f"[{row + 1}] {MODE_LABELS[mode]}")
+        self.put(12, 2, "[p] Change player   [c] Next constant   [q] Quit")
+        self.stdscr.refresh()
+
+    def change_player(self):
+        """Prompts for a player name on the menu screen."""
+        self.put(14, 2, "Player name: ")
+        self.stdscr.clrtoeol()
+        curses.echo()
+        curses.curs_set(1)
+        try:
+            name = self.stdscr.getstr(14, 15, MAX_PROFILE_NAME_LENGTH)
+        finally:
+            curses.noecho()
+            curses.curs_set(0)
+        name = name.decode(locale.getpreferredencoding(False), 'replace').strip()
+        if name: # An empty entry keeps the current player
+            self.game_logic.set_profile(name)
+
+    def countdown(self) -> bool:
+        """3-2-1 countdown; returns False if the player backs out with Esc."""
+        self.stdscr.timeout(1000)
+        for value in (3, 2, 1):
+            self.stdscr.erase()
+            self.put(3, 4, str(value), curses.A_BOLD)
+            self.stdscr.refresh()
+            if self.stdscr.getch() == ESCAPE_KEY:
+                return False
+        curses.flushinp() # Don't score keys mashed during the countdown
+        return True
+
+    def play(self, mode: str):
+        round_ = GameRound(self.game_logic, mode)
+        round_.start()
+        self.stdscr.timeout(REFRESH_MS)
+        feedback = ""
+        while round_.active:
+            if round_.timer.expired():
+                round_.finish("Time's up!")
+                break
+            self.draw_round(round_, feedback)
+            key = self.stdscr.getch()
+            if key == -1:
+                continue
+            if key == ESCAPE_KEY:
+                round_.finish("Round abandoned.")
+                self.show_game_over(round_, saved=False)
+                return
+            char = chr(key) if 0 <= key < 256 else ''
+            if not (char.isdigit() or char == '.'):
+                continue
+            result = round_.submit(char)
+            if result == GameRound.CORRECT:
+                feedback = ""
+            elif result == GameRound.INCORRECT:
+                feedback = f"✗ {char}"
+                curses.beep()
+
+        run_path = save_run(round_, profile=self.game_logic.profile)
+        self.game_logic.update_high_score(mode, round_.score, run_path)
+        self.show_game_over(round_, saved=True)
+
+    def draw_round(self, round_: GameRound, feedback: str):
+        self.stdscr.erase()
+        hud = f"Score: {round_.score}   Combo: {round_.combo}   Time: {format_remaining(round_.timer.remaining())}"
+        if round_.max_mistakes is not None:
+            hud += f"   Mistakes: {round_.mistakes}/{round_.max_mistakes}"
+        self.put(0, 2, hud, curses.A_BOLD)
+
+        typed = self.game_logic.digits[:round_.index]
+        lines = [typed[i:i + DIGITS_PER_LINE] for i in range(0, len(typed), DIGITS_PER_LINE)]
+        if not lines or len(lines[-1]) == DIGITS_PER_LINE:
+            lines.append("")
+        lines = lines[-MAX_LINES_DISPLAYED:]
+        for row, line in enumerate(lines):
+            current = row == len(lines) - 1
+            # Spaced out so the digits are easy to read at a glance
+            text = " ".join(line)
+            self.put(2 + row, 4, text, self.color(CORRECT) if current else self.color(DIM) | curses.A_DIM)
+            if current:
+                self.put(2 + row, 4 + len(text) + (1 if line else 0), "_", self.color(CURSOR) | curses.A_BOLD)
+        if feedback:
+            self.put(3 + MAX_LINES_DISPLAYED, 4, feedback, self.color(ERROR) | curses.A_BOLD)
+        self.put(4 + MAX_LINES_DISPLAYED, 2, "[Esc] Abandon round", curses.A_DIM)
+        self.stdscr.refresh()
+
+    def show_game_over(self, round_: GameRound, saved: bool):
+        self.stdscr.timeout(-1)
+        curses.flushinp()
+        self.stdscr.erase()
+        self.put(1, 2, f"Game Over: {round_.end_reason}", curses.A_BOLD)
+        self.put(3, 2, f"Score: {round_.score}")
+        self.put(4, 2, f"Keystrokes/s: {round_.timer.keystrokes_per_second():.2f}")
+        if saved:
+            self.put(5, 2, f"{round_.mode} High Score: {self.game_logic.get_high_score(round_.mode)}")
+        self.put(7, 2, "Press any key to continue", curses.A_DIM)
+        self.stdscr.refresh()
+        self.stdscr.getch()
+
+def main() -> int:
+    """Entry point for the terminal front end."""
+    if curses is None:
+        print("Error: curses is not available (on Windows, pip install windows-curses).")
+        return 1
+    locale.setlocale(locale.LC_ALL, '') # Needed to draw π and ∞
+    game_logic = GameLogic()
+    try:
+        curses.wrapper(lambda stdscr: TerminalGame(stdscr, game_logic).run())
+    finally:
+        game_logic.constants.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
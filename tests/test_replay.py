@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+import replay
+from game_logic import GameLogic
+from score_store import ScoreStore
+
+@pytest.fixture(scope='module')
+def game_logic():
+    return GameLogic(load_high_scores=False)
+
+def make_run(game_logic, intervals, mode='Blitz'):
+    """A run that types the first len(intervals) characters correctly."""
+    keys = ''.join(game_logic.get_pi_digit(i) for i in range(len(intervals)))
+    return {'version': replay.RUN_FORMAT_VERSION, 'mode': mode, 'score': len(keys),
+            'keys': keys, 'intervals': replay.encode_varints(intervals)}
+
+def test_steady_run_is_valid(game_logic):
+    assert replay.validate_run(make_run(game_logic, [400] + [150] * 60), game_logic) == []
+
+def test_occasional_overlapping_presses_are_valid(game_logic):
+    # Two thumbs on the keypad or keyboard rollover: a different key now and
+    # then less than MIN_KEY_INTERVAL_MS after the previous one
+    intervals = [400] + [150] * 60
+    for i in (12, 30, 31 + replay.BURST_KEYS, 58):
+        intervals[i] = 20
+    run = make_run(game_logic, intervals)
+    assert all(run['keys'][i - 1] != run['keys'][i] for i in (12, 30, 31 + replay.BURST_KEYS, 58))
+    assert replay.validate_run(run, game_logic) == []
+
+def test_chunked_keys_are_rejected(game_logic):
+    # Five keys at once, then a pause: slow on average, but no one types like that
+    intervals = [400] + [600 if i % 5 == 0 else 0 for i in range(60)]
+    reasons = replay.validate_run(make_run(game_logic, intervals), game_logic)
+    assert any(f"less than {replay.MIN_KEY_INTERVAL_MS} ms apart" in reason for reason in reasons)
+
+def test_sustained_burst_is_rejected(game_logic):
+    reasons = replay.validate_run(make_run(game_logic, [400] + [35] * 60), game_logic)
+    assert any("keys/s" in reason for reason in reasons)
+
+def test_wrong_score_is_rejected(game_logic):
+    run = make_run(game_logic, [400] + [150] * 20)
+    run['score'] += 1
+    assert replay.validate_run(run, game_logic) == [
+        f"claimed score {run['score']} but the replay scores {run['score'] - 1}"]
+
+def save_backed_score(store, runs_dir, game_logic, profile, score):
+    """Stores a best score together with a valid run that backs it."""
+    run = make_run(game_logic, [400] + [150] * (score - 1))
+    run['player'] = profile
+    run_name = f"{profile}-{score}.json"
+    (runs_dir / run_name).write_text(json.dumps(run))
+    store.record_score(profile, run['mode'], score, run_name)
+
+def test_stored_score_backed_by_its_run_is_valid(game_logic, tmp_path):
+    store = ScoreStore(str(tmp_path))
+    save_backed_score(store, tmp_path, game_logic, 'Ada', 40)
+    assert replay.check_stored_scores(store, runs_dir=str(tmp_path)) == (1, [])
+
+def test_hand_edited_scores_are_rejected(game_logic, tmp_path):
+    store = ScoreStore(str(tmp_path))
+    save_backed_score(store, tmp_path, game_logic, 'Ada', 40)
+    # A higher score pointing at the same run, and one with no run at all
+    store.record_score('Ada', 'Blitz', 90, 'Ada-40.json')
+    store.record_score('Bob', 'Blitz', 500)
+    checked, rejected = replay.check_stored_scores(store, runs_dir=str(tmp_path))
+    assert checked == 2
+    assert rejected == [('Ada Blitz 90', ["run log Ada-40.json scores 40"]),
+                        ('Bob Blitz 500', ["no run log recorded with the score"])]
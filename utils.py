@@ -0,0 +1,41 @@
+"""
+Small helpers shared by the game's modules: on/off environment switches and
+atomic file writes.
+
+This module imports nothing from the game (or Kivy), so any module can use it.
+"""
+
+import contextlib
+import os
+
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Reads an on/off environment variable; unset or empty gives the default.
+
+    '0', 'false', 'no' and 'off' (any case) turn it off, anything else on.
+    """
+    value = os.environ.get(name, '').strip().lower()
+    if not value:
+        return default
+    return value not in FALSE_VALUES
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', fsync=False):
+    """Opens a temp file next to path and moves it over path when the block ends.
+
+    Readers see the old file or the complete new one, never half of it. If the
+    block raises, the temp file is removed and path is left untouched.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise